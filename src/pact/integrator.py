@@ -7,20 +7,39 @@ glue code wiring children together.
 When parent-level tests fail, I/O tracing finds the failure point.
 """
 
+# perf-note: this module is I/O-bound. Wall time goes to (a) awaiting LLM
+# responses, (b) test-runner subprocesses, and (c) filesystem reads and
+# writes. There are no numeric inner loops, so JIT/AOT compilers (Numba,
+# Cython, mypyc) buy nothing here and Numba alone adds hundreds of ms of
+# import time to every CLI invocation. Do not add them; see
+# test_integrator.py::TestNoJitDependencies. Speedups belong in fewer or
+# smaller LLM calls (integrator_cache, child-source budget, plateau
+# detection) and in overlapping waits (runner warm-up, parallel groups).
+
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
-from collections.abc import Callable
+import os
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Literal
+
+from pydantic import TypeAdapter
 
 from pact.agents.base import AgentBase
-from pact.project import ProjectManager
+from pact.budget import estimate_tokens
+from pact.integrator_cache import compute_key, load_integration, save_integration
+from pact.project import AuditBatch, ProjectManager
 from pact.schemas import (
     ComponentContract,
     ContractTestSuite,
     DecompositionTree,
     TestResults,
 )
+from pact.source_summary import summarize_source
 from pact.test_harness import run_contract_tests
 
 logger = logging.getLogger(__name__)
@@ -49,6 +68,304 @@ exports. Glue code handles data transformation and routing — no
 business logic. Plain JavaScript ES6+ modules only."""
 
 
+def _write_file(path: Path, data: str) -> None:
+    """Write text to ``path`` via a raw fd, truncating any existing file.
+
+    Skips the text-mode wrapper and buffer that ``Path.write_text`` sets up
+    on every call. Not atomic and not fsynced — these are regenerated
+    artifacts, so a crash mid-write just means the next attempt rewrites them.
+    """
+    buf = memoryview(data.encode())
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while buf:
+            buf = buf[os.write(fd, buf):]
+    finally:
+        os.close(fd)
+
+
+# Upper bound on the runner warm-up; it normally finishes in a few seconds.
+_WARMUP_TIMEOUT = 30
+
+
+async def _warmup_runner(language: str, project_dir: Path) -> None:
+    """Best-effort test-runner cold start, overlapped with the LLM call.
+
+    Loads pytest for Python, or resolves vitest through npx for
+    TypeScript and JavaScript, once so the OS page cache and npx
+    resolution are hot by the time the real test run starts. Other
+    languages have nothing to warm. Failures are ignored — the real run
+    reports its own errors.
+    """
+    if language == "python":
+        cmd = ["python3", "-c", "import pytest"]
+    elif language in ("typescript", "javascript"):
+        cmd = ["npx", "vitest", "--version"]
+    else:
+        return
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=str(project_dir),
+        )
+    except OSError:
+        return
+    try:
+        await asyncio.wait_for(proc.wait(), timeout=_WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
+
+
+# Token budget for child implementation source embedded in the glue prompt.
+# Over budget, files are reduced to their API surface, then dropped from
+# the end.
+_CHILD_IMPL_TOKEN_BUDGET = 8000
+
+
+_SOURCE_EXTS = (".py", ".ts", ".js")
+_SKIP_SOURCE_DIRS = frozenset({"node_modules", "__pycache__"})
+
+
+def _walk_sources(root: str, exts: tuple[str, ...] = _SOURCE_EXTS) -> Iterator[str]:
+    """Yield source file paths under ``root`` in a single scandir pass.
+
+    Filters on the entry name and the cached dirent type, so no Path
+    objects or extra stat calls per entry. Symlinks are not followed.
+    Entries are visited in sorted order so the output is deterministic.
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_SOURCE_DIRS:
+                    subdirs.append(entry.path)
+            elif entry.name.endswith(exts) and entry.is_file(follow_symlinks=False):
+                yield entry.path
+        stack.extend(reversed(subdirs))
+
+
+def _load_child_sources(
+    project: ProjectManager,
+    child_contracts: dict[str, ComponentContract],
+) -> list[tuple[str, str, str]]:
+    """Read child implementation files as (child_id, filename, source)."""
+    sources = []
+    for cid in child_contracts:
+        for path in _walk_sources(str(project.impl_src_dir(cid))):
+            with open(path, "rb") as f:
+                source = f.read().decode("utf-8", errors="replace")
+            sources.append((cid, os.path.basename(path), source))
+    return sources
+
+
+def _impl_section(cid: str, filename: str, source: str) -> str:
+    return f"\n\n=== {cid} implementation ({filename}) ===\n{source}"
+
+
+def _render_child_impls(
+    sources: list[tuple[str, str, str]],
+    token_budget: int = _CHILD_IMPL_TOKEN_BUDGET,
+) -> str:
+    """Child sources for the prompt, kept within ``token_budget``.
+
+    Full source when it fits; otherwise each file is summarized to its
+    public signatures, and files that still don't fit are omitted.
+    """
+    full = "".join(_impl_section(*src) for src in sources)
+    if estimate_tokens(full) <= token_budget:
+        return full
+
+    sections: list[str] = []
+    used = 0
+    for cid, filename, source in sources:
+        section = _impl_section(
+            cid, f"{filename}, signatures only",
+            summarize_source(filename, source),
+        )
+        cost = estimate_tokens(section)
+        if used + cost > token_budget:
+            omitted = len(sources) - len(sections)
+            sections.append(
+                f"\n\n({omitted} more implementation file(s) omitted "
+                f"to stay within the context budget)"
+            )
+            break
+        sections.append(section)
+        used += cost
+    return "".join(sections)
+
+
+def _write_if_changed(path: Path, data: str) -> bool:
+    """Write ``data`` to ``path`` unless it already holds exactly that.
+
+    A size mismatch short-circuits without reading the file; otherwise
+    the bytes are compared directly. Unchanged files keep their mtime, so
+    file watchers in dev loops are not re-triggered.
+
+    Returns:
+        True if the file was written.
+    """
+    encoded = data.encode()
+    try:
+        if os.stat(path).st_size == len(encoded):
+            with open(path, "rb") as f:
+                if f.read() == encoded:
+                    return False
+    except OSError:
+        pass
+    _write_file(path, data)
+    return True
+
+
+def _write_results_if_changed(path: Path, test_results: TestResults) -> bool:
+    """Save ``test_results`` unless ``path`` already records the same outcome.
+
+    Every run stamps a fresh ``timestamp``, so the serialized results never
+    match byte-for-byte; the stored results are compared with the timestamp
+    excluded, and an unchanged file keeps its original run time and mtime.
+
+    Returns:
+        True if the file was written.
+    """
+    try:
+        stored = TestResults.model_validate_json(path.read_bytes())
+    except (OSError, ValueError):
+        stored = None
+    if stored is not None and (
+        stored.model_dump(exclude={"timestamp"})
+        == test_results.model_dump(exclude={"timestamp"})
+    ):
+        return False
+    _write_file(path, test_results.model_dump_json(indent=2))
+    return True
+
+
+_CHILD_CONTRACTS_ADAPTER = TypeAdapter(dict[str, ComponentContract])
+
+
+def _child_contracts_json(child_contracts: dict[str, ComponentContract]) -> str:
+    """Serialize all child contracts as one JSON object keyed by child id.
+
+    A single pydantic-core call replaces one ``model_dump_json`` per child
+    plus the Python-level join, and the prompt gets a valid JSON document.
+    """
+    return _CHILD_CONTRACTS_ADAPTER.dump_json(child_contracts, indent=2).decode()
+
+
+# Per-failure error text kept for the next prompt, and how many distinct
+# failures are carried forward. Older entries drop off first.
+_MAX_FAILURE_CHARS = 300
+_MAX_PRIOR_FAILURES = 20
+
+
+# Seconds to wait before re-running tests after a runner-side failure.
+_RERUN_DELAY = 0.5
+
+# Output fragments that mean the test runner itself could not run, as
+# opposed to the glue code failing its tests.
+_INFRA_MARKERS = (
+    "No module named pytest",
+    "No module named 'pytest'",
+    "vitest: not found",
+    "npx: not found",
+    "command not found",
+    "Cannot find package 'vitest'",
+    "Resource temporarily unavailable",
+    "Too many open files",
+)
+
+
+def _classify_failure(test_results: TestResults) -> Literal["infra", "logic", "timeout"]:
+    """Whose fault is a failed test run: the runner's or the glue's?
+
+    ``timeout`` and ``infra`` failures are retried with the same glue;
+    only ``logic`` failures (wrong answers, import errors in the glue,
+    assertion failures) justify asking the model for new glue.
+    """
+    details = test_results.failure_details
+    if not details:
+        return "logic"
+    if all(f.test_id == "timeout" for f in details):
+        return "timeout"
+    if all(
+        f.test_id == "execution"
+        or any(m in f.error_message or m in f.stderr for m in _INFRA_MARKERS)
+        for f in details
+    ):
+        return "infra"
+    return "logic"
+
+
+def _record_failures(
+    prior_failures: OrderedDict[tuple[str, int], dict],
+    test_results: TestResults,
+    kind: str = "logic",
+) -> frozenset[tuple[str, int]]:
+    """Fold an attempt's failures into the deduplicated failure log.
+
+    Failures are keyed on (test_id, hash of the leading error text), so
+    the same failure across attempts bumps a counter instead of being
+    repeated verbatim in the next prompt. Non-logic failures carry their
+    ``kind`` so the model knows not to chase them in the glue.
+
+    Returns:
+        The set of failure signatures seen in this attempt.
+    """
+    signatures = set()
+    for failure in test_results.failure_details:
+        key = (failure.test_id, hash(failure.error_message[:200]))
+        signatures.add(key)
+        if key in prior_failures:
+            prior_failures[key]["seen"] += 1
+            prior_failures.move_to_end(key)
+        else:
+            prior_failures[key] = {
+                "test": failure.test_id,
+                "error": failure.error_message[:_MAX_FAILURE_CHARS],
+                "seen": 1,
+            }
+            if kind != "logic":
+                prior_failures[key]["kind"] = kind
+    while len(prior_failures) > _MAX_PRIOR_FAILURES:
+        prior_failures.popitem(last=False)
+    return frozenset(signatures)
+
+
+def _format_failure_context(
+    prior_failures: OrderedDict[tuple[str, int], dict],
+) -> str:
+    """Render the failure log as a compact JSON block for the prompt."""
+    if not prior_failures:
+        return ""
+    entries = list(prior_failures.values())
+    repeated = [e["test"] for e in entries if e["seen"] > 1 and "kind" not in e]
+    block = {
+        "prior_failures": entries,
+        "stop_doing": (
+            "Reusing the wiring behind failures seen in more than one attempt"
+            if repeated else ""
+        ),
+        "try_doing": [
+            f"A different delegation for '{test_id}' — re-check the child "
+            f"contract it depends on"
+            for test_id in repeated
+        ],
+    }
+    return "\nPrior failures:\n" + json.dumps(block, indent=1)
+
+
 async def integrate_component(
     agent: AgentBase,
     project: ProjectManager,
@@ -86,15 +403,53 @@ async def integrate_component(
         for f in parent_contract.functions
     )
 
-    prior_failures: list[str] = []
+    # Contract JSON is stable across attempts — serialize once
+    parent_contract_json = parent_contract.model_dump_json(indent=2)
+    child_contracts_json = _child_contracts_json(child_contracts)
+
+    # Load child implementation source code (stable across attempts)
+    child_sources = _load_child_sources(project, child_contracts)
+    child_impls = _render_child_impls(child_sources)
 
-    for attempt in range(1, max_attempts + 1):
-        failure_context = ""
-        if prior_failures:
-            failure_context = (
-                "\nPrior failures:\n"
-                + "\n".join(f"  - {f}" for f in prior_failures)
+    comp_dir = project.composition_dir(parent_id)
+    cache_key = compute_key(
+        parent_contract, child_contracts,
+        "".join(_impl_section(*src) for src in child_sources),
+        parent_test_suite.generated_code,
+    )
+    cached = load_integration(project.integration_cache_dir, cache_key)
+    if cached is not None:
+        _write_if_changed(comp_dir / f"glue{glue_ext}", cached.glue_code)
+        if cached.composition_test:
+            test_ext = ".test.ts" if is_ts else ".py"
+            visible_test_dir = project._visible_tests_dir / parent_id
+            visible_test_dir.mkdir(parents=True, exist_ok=True)
+            _write_file(
+                visible_test_dir / f"composition_test{test_ext}",
+                cached.composition_test,
             )
+        # Keep the saved results in step with what this call returns
+        _write_results_if_changed(
+            project._internal_composition_dir(parent_id) / "test_results.json",
+            cached.test_results,
+        )
+        project.append_audit(
+            "integration",
+            f"{parent_id} cache hit ({cache_key})",
+        )
+        logger.info(
+            "Integration %s unchanged since last pass — reusing cached glue",
+            parent_id,
+        )
+        return cached.test_results
+
+    prior_failures: OrderedDict[tuple[str, int], dict] = OrderedDict()
+    last_signatures: frozenset[tuple[str, int]] = frozenset()
+    rerun_reason = ""
+
+    async def _author_glue(attempt: int, audit: AuditBatch) -> GlueResponse:
+        """Ask the LLM for glue, then save it and its composition tests."""
+        failure_context = _format_failure_context(prior_failures)
 
         if is_ts:
             lang_label = "TypeScript"
@@ -112,21 +467,6 @@ async def integrate_component(
             lang_label = "Python"
             import_hint = "- Import from each child's module"
 
-        # Build full child contract JSON
-        child_contracts_json = "\n\n".join(
-            f'"{cid}":\n{c.model_dump_json(indent=2)}'
-            for cid, c in child_contracts.items()
-        )
-
-        # Load child implementation source code
-        child_impls = ""
-        for cid in child_contracts:
-            impl_src = project.impl_src_dir(cid)
-            if impl_src.exists():
-                for src_file in impl_src.rglob("*"):
-                    if src_file.is_file() and src_file.suffix in (".py", ".ts", ".js"):
-                        child_impls += f"\n\n=== {cid} implementation ({src_file.name}) ===\n{src_file.read_text()}"
-
         prompt = f"""Generate glue code to compose children into the parent interface.
 
 Parent: {parent_contract.name} (id: {parent_id})
@@ -137,7 +477,7 @@ Children:
 {children_summary}
 
 Parent contract (JSON):
-{parent_contract.model_dump_json(indent=2)}
+{parent_contract_json}
 
 Child contracts (full JSON):
 {child_contracts_json}
@@ -158,9 +498,8 @@ The glue code should:
         response, _, _ = await agent.assess(GlueResponse, prompt, system)
 
         # Save glue code
-        comp_dir = project.composition_dir(parent_id)
         glue_path = comp_dir / f"glue{glue_ext}"
-        glue_path.write_text(response.glue_code)
+        _write_if_changed(glue_path, response.glue_code)
 
         if response.composition_test:
             test_ext = ".test.ts" if is_ts else ".py"
@@ -168,54 +507,110 @@ The glue code should:
             visible_test_dir = project._visible_tests_dir / parent_id
             visible_test_dir.mkdir(parents=True, exist_ok=True)
             test_path = visible_test_dir / f"composition_test{test_ext}"
-            test_path.write_text(response.composition_test)
+            _write_file(test_path, response.composition_test)
 
-        project.append_audit(
+        audit.append(
             "integration",
             f"{parent_id} attempt {attempt}",
         )
+        return response
 
-        # Run parent tests
-        test_file = project.test_code_path(parent_id)
-        if not test_file.exists() and parent_test_suite.generated_code:
-            test_file.parent.mkdir(parents=True, exist_ok=True)
-            test_file.write_text(parent_test_suite.generated_code)
-
-        # Include child implementation src/ dirs so glue code can import them
-        child_paths = [
-            project.impl_src_dir(cid) for cid in child_contracts
-        ]
-
-        test_results = await run_contract_tests(
-            test_file, comp_dir, extra_paths=child_paths,
-            language=language,
-            project_dir=project.project_dir,
-        )
+    # Parent test file and child paths don't change between attempts
+    test_file = project.test_code_path(parent_id)
+    if not test_file.exists() and parent_test_suite.generated_code:
+        test_file.parent.mkdir(parents=True, exist_ok=True)
+        test_file.write_text(parent_test_suite.generated_code)
 
-        # Save results to internal composition dir
-        internal_comp = project._internal_composition_dir(parent_id)
-        results_path = internal_comp / "test_results.json"
-        results_path.write_text(test_results.model_dump_json(indent=2))
+    # Include child implementation src/ dirs so glue code can import them
+    child_paths = [
+        project.impl_src_dir(cid) for cid in child_contracts
+    ]
 
-        if test_results.all_passed:
-            logger.info(
-                "Integration %s passed all %d tests on attempt %d",
-                parent_id, test_results.total, attempt,
-            )
-            return test_results
+    # Warm the test runner while the first LLM call is in flight
+    warmup = asyncio.create_task(_warmup_runner(language, project.project_dir))
+    with project.audit_batch() as audit:
+        try:
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    if rerun_reason:
+                        # Last failure was the runner, not the glue — keep the glue
+                        logger.info(
+                            "Integration %s attempt %d: re-running tests after %s "
+                            "failure without regenerating glue",
+                            parent_id, attempt, rerun_reason,
+                        )
+                        await asyncio.sleep(_RERUN_DELAY)
+                        audit.append(
+                            "integration",
+                            f"{parent_id} attempt {attempt}: test re-run after {rerun_reason}",
+                        )
+                    else:
+                        response = await _author_glue(attempt, audit)
+
+                    await warmup
+                    test_results = await run_contract_tests(
+                        test_file, comp_dir, extra_paths=child_paths,
+                        language=language,
+                        project_dir=project.project_dir,
+                    )
+
+                    # Save results to internal composition dir
+                    internal_comp = project._internal_composition_dir(parent_id)
+                    results_path = internal_comp / "test_results.json"
+                    _write_results_if_changed(results_path, test_results)
+
+                    if test_results.all_passed:
+                        logger.info(
+                            "Integration %s passed all %d tests on attempt %d",
+                            parent_id, test_results.total, attempt,
+                        )
+                        save_integration(
+                            project.integration_cache_dir, cache_key,
+                            response.glue_code, response.composition_test, test_results,
+                        )
+                        return test_results
+
+                    logger.warning(
+                        "Integration %s failed %d/%d tests on attempt %d",
+                        parent_id, test_results.failed + test_results.errors,
+                        test_results.total, attempt,
+                    )
+
+                    kind = _classify_failure(test_results)
+                    signatures = _record_failures(prior_failures, test_results, kind)
+                    if kind != "logic" and not rerun_reason:
+                        # Runner trouble, not a glue bug: re-run once with the same
+                        # glue before spending another LLM call on it.
+                        rerun_reason = kind
+                        continue
+                    rerun_reason = ""
+                    if signatures and signatures == last_signatures:
+                        logger.warning(
+                            "Integration %s plateaued: attempt %d repeated the previous "
+                            "failures exactly — stopping early",
+                            parent_id, attempt,
+                        )
+                        break
+                    last_signatures = signatures
+                finally:
+                    # Persist this attempt's audit entries before the next one
+                    # starts, so a crash or kill loses at most the current attempt.
+                    audit.flush()
+        finally:
+            if not warmup.done():
+                warmup.cancel()
 
-        for failure in test_results.failure_details:
-            prior_failures.append(
-                f"Test '{failure.test_id}': {failure.error_message}"
-            )
+    return test_results
 
-        logger.warning(
-            "Integration %s failed %d/%d tests on attempt %d",
-            parent_id, test_results.failed + test_results.errors,
-            test_results.total, attempt,
-        )
 
-    return test_results
+async def _run_limited(
+    sem: asyncio.Semaphore,
+    integrate_one: Callable[[str], Awaitable[tuple[str, TestResults] | None]],
+    component_id: str,
+) -> tuple[str, TestResults] | None:
+    """Run one parent integration under the group's concurrency limit."""
+    async with sem:
+        return await integrate_one(component_id)
 
 
 async def integrate_all(
@@ -293,12 +688,9 @@ async def integrate_all(
     for group in groups:
         if parallel and len(group) > 1:
             sem = asyncio.Semaphore(max_concurrent)
-
-            async def _limited(cid: str) -> tuple[str, TestResults] | None:
-                async with sem:
-                    return await _integrate_one(cid)
-
-            gather_results = await asyncio.gather(*[_limited(cid) for cid in group])
+            gather_results = await asyncio.gather(
+                *[_run_limited(sem, _integrate_one, cid) for cid in group]
+            )
             for result in gather_results:
                 if result:
                     results[result[0]] = result[1]
@@ -352,6 +744,9 @@ async def integrate_component_iterative(
         for f in parent_contract.functions
     )
 
+    parent_contract_json = parent_contract.model_dump_json(indent=2)
+    child_contracts_json = _child_contracts_json(child_contracts)
+
     # Gather child implementation paths (absolute for env vars, relative for prompts)
     child_src_dirs = {
         cid: project.impl_src_dir(cid) for cid in child_contracts
@@ -377,12 +772,12 @@ async def integrate_component_iterative(
 
     module_name = parent_id.replace("-", "_")
 
-    if is_ts or is_js:
-        # Build NODE_PATH for TypeScript/JavaScript module resolution
-        node_path_parts = [str(comp_dir), str(comp_dir.parent)]
-        node_path_parts.extend(str(p) for p in child_src_dirs.values())
-        env_path_str = ":".join(node_path_parts)
+    # NODE_PATH / PYTHONPATH so glue can resolve child modules
+    env_path_parts = [str(comp_dir), str(comp_dir.parent)]
+    env_path_parts.extend(str(p) for p in child_src_dirs.values())
+    env_path_str = ":".join(env_path_parts)
 
+    if is_ts or is_js:
         ts_specific = ""
         if is_ts:
             ts_specific = "   - Use named exports only (no default exports)\n"
@@ -401,14 +796,14 @@ Parent functions:
 {parent_funcs}
 
 Parent contract (JSON):
-{parent_contract.model_dump_json(indent=2)}
+{parent_contract_json}
 
 ## Children
 
 {children_summary}
 
 Child contracts:
-{chr(10).join(f'{cid}: {c.model_dump_json(indent=2)}' for cid, c in child_contracts.items())}
+{child_contracts_json}
 
 ## Child Implementation Locations
 
@@ -447,11 +842,6 @@ Children are importable using ESM imports. For example:
 {f'Learnings: {learnings}' if learnings else ''}
 """
     else:
-        # Build PYTHONPATH that includes child implementation dirs
-        pythonpath_parts = [str(comp_dir), str(comp_dir.parent)]
-        pythonpath_parts.extend(str(p) for p in child_src_dirs.values())
-        pythonpath_str = ":".join(pythonpath_parts)
-
         prompt = f"""You are an integration engineer. Wire child components together into the parent interface.
 
 ## Parent Component: {parent_contract.name} (id: {parent_id})
@@ -460,14 +850,14 @@ Parent functions:
 {parent_funcs}
 
 Parent contract (JSON):
-{parent_contract.model_dump_json(indent=2)}
+{parent_contract_json}
 
 ## Children
 
 {children_summary}
 
 Child contracts:
-{chr(10).join(f'{cid}: {c.model_dump_json(indent=2)}' for cid, c in child_contracts.items())}
+{child_contracts_json}
 
 ## Child Implementation Locations
 
@@ -499,7 +889,7 @@ Do NOT use sys.path manipulation. Just import children by their module name.
    - Match the exact type names, function signatures, and enum values from the contract
    - Do NOT add business logic — only wiring and delegation
 4. Run tests with correct PYTHONPATH:
-   PYTHONPATH="{pythonpath_str}" python3 -m pytest {test_file_rel} -v
+   PYTHONPATH="{env_path_str}" python3 -m pytest {test_file_rel} -v
 5. If tests fail, read the errors, fix your glue code, and re-run
 6. Keep iterating until ALL tests pass
 
@@ -545,7 +935,7 @@ Do NOT use sys.path manipulation. Just import children by their module name.
     # Save results to internal composition dir
     internal_comp = project._internal_composition_dir(parent_id)
     results_path = internal_comp / "test_results.json"
-    results_path.write_text(test_results.model_dump_json(indent=2))
+    _write_results_if_changed(results_path, test_results)
 
     project.append_audit(
         "test_run",
@@ -633,12 +1023,9 @@ async def integrate_all_iterative(
     for group in groups:
         if parallel and len(group) > 1:
             sem = asyncio.Semaphore(max_concurrent)
-
-            async def _limited(cid: str) -> tuple[str, TestResults] | None:
-                async with sem:
-                    return await _integrate_one(cid)
-
-            gather_results = await asyncio.gather(*[_limited(cid) for cid in group])
+            gather_results = await asyncio.gather(
+                *[_run_limited(sem, _integrate_one, cid) for cid in group]
+            )
             for result in gather_results:
                 if result:
                     results[result[0]] = result[1]
@@ -0,0 +1,96 @@
+"""Integration cache — skip glue regeneration for unchanged subtrees.
+
+Re-running integration after fixing a sibling used to re-invoke the LLM
+for every parent, even when nothing under that parent had changed. The
+cache key is a SHA-256 over everything that determines the glue: the
+parent contract, the child contracts, the child implementation sources,
+and the parent test code. Only passing results are stored, so a hit is
+always safe to reuse. Entries live at {key}.json under
+ProjectManager.integration_cache_dir.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from pact.schemas import ComponentContract, TestResults
+
+logger = logging.getLogger(__name__)
+
+
+class IntegrationCacheEntry(BaseModel):
+    """A previously successful integration."""
+    glue_code: str
+    composition_test: str = ""
+    test_results: TestResults
+
+
+def compute_key(
+    parent_contract: ComponentContract,
+    child_contracts: dict[str, ComponentContract],
+    child_impls: str,
+    test_suite_code: str,
+) -> str:
+    """Deterministic key from every input that shapes the glue code.
+
+    Args:
+        parent_contract: The parent being integrated.
+        child_contracts: Child id -> contract.
+        child_impls: Concatenated child implementation sources.
+        test_suite_code: Generated code of the parent test suite.
+
+    Returns:
+        A string key like "root__a1b2c3d4e5f6a7b8".
+    """
+    hasher = hashlib.sha256()
+    hasher.update(parent_contract.model_dump_json().encode())
+    for cid in sorted(child_contracts):
+        hasher.update(b"\0" + cid.encode() + b"\0")
+        hasher.update(child_contracts[cid].model_dump_json().encode())
+    hasher.update(b"\0---\0" + child_impls.encode())
+    hasher.update(b"\0---\0" + test_suite_code.encode())
+    return f"{parent_contract.component_id}__{hasher.hexdigest()[:16]}"
+
+
+def _cache_path(cache_dir: Path, key: str) -> Path:
+    return cache_dir / f"{key}.json"
+
+
+def save_integration(
+    cache_dir: Path,
+    key: str,
+    glue_code: str,
+    composition_test: str,
+    test_results: TestResults,
+) -> None:
+    """Persist a passing integration. Failing results are never cached."""
+    if not test_results.all_passed:
+        return
+    path = _cache_path(cache_dir, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry = IntegrationCacheEntry(
+        glue_code=glue_code,
+        composition_test=composition_test,
+        test_results=test_results,
+    )
+    path.write_text(entry.model_dump_json(indent=2))
+    logger.debug("Cached integration: %s", key)
+
+
+def load_integration(cache_dir: Path, key: str) -> IntegrationCacheEntry | None:
+    """Load a cached integration if it exists. Returns None if missing."""
+    path = _cache_path(cache_dir, key)
+    if not path.exists():
+        return None
+    try:
+        entry = IntegrationCacheEntry.model_validate_json(path.read_bytes())
+    except (OSError, ValidationError):
+        logger.warning("Failed to load cached integration: %s", key)
+        return None
+    if not entry.test_results.all_passed:
+        return None
+    return entry
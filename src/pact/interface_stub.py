@@ -13,29 +13,47 @@ Even for dynamically-typed target languages, the stub gives agents a
 precise conceptual model. We don't need the language to be strongly typed;
 we just need agents to know the valid shapes, constraints, and expectations.
 
-Six output formats:
+Eight output formats:
   1. render_stub()           — Python-style interface stub (.pyi-like)
   2. render_stub_ts()        — TypeScript interface stub (.d.ts-like)
-  3. render_stub_rust()      — Rust interface stub (pub struct/enum/fn)
-  4. render_dependency_map() — compact reference for all dependencies
-  5. render_compact_deps()   — function signatures + type shapes (~80% smaller)
-  6. render_handoff_brief()  — complete context for agent handoff
+  3. render_stub_js()        — JavaScript stub with JSDoc types
+  4. render_stub_rust()      — Rust interface stub (pub struct/enum/fn)
+  5. render_dependency_map() — compact reference for all dependencies
+  6. render_compact_deps()   — function signatures + type shapes (~80% smaller)
+  7. render_compact_stub()   — render_compact_deps() for a single contract
+  8. render_handoff_brief()  — complete context for agent handoff
+
+The stub renderers are templates written as f-strings: each line is a
+constant-folded format compiled into the function's bytecode, streamed
+into one StringIO and returned as a single string. A template engine
+would add a dependency and an extra interpretation layer without
+removing any work from that path.
+
+The module stays pure Python and is not built with mypyc or Cython. The
+hot loops read attributes off pydantic models, which compiled code still
+reaches through the generic object protocol. A native build would also
+turn the pure wheel into per-platform wheels that need a C toolchain.
 """
 
 from __future__ import annotations
 
+import functools
 import hashlib
-
-from pact.schemas import (
-    ComponentContract,
-    ContractTestSuite,
-    DecompositionTree,
-    FieldSpec,
-    FunctionContract,
-    RunState,
-    TestResults,
-    TypeSpec,
-)
+import io
+import re
+from typing import TYPE_CHECKING, Callable, Literal
+
+if TYPE_CHECKING:
+    from pact.schemas import (
+        ComponentContract,
+        ContractTestSuite,
+        DecompositionTree,
+        FieldSpec,
+        FunctionContract,
+        RunState,
+        TestResults,
+        TypeSpec,
+    )
 
 
 # ── Interface Stub Rendering ─────────────────────────────────────────
@@ -68,43 +86,72 @@ def get_required_exports(contract: ComponentContract) -> list[str]:
     if any are missing.
 
     Filters out: dotted names (methods), dunder names, Python builtins,
-    and primitive type aliases.
+    and primitive type aliases. Each name appears once, in first-seen order.
     """
+    if not contract.types and not contract.functions:
+        return []
     exports: list[str] = []
+    seen: set[str] = set()
+
+    def add(name: str) -> None:
+        if name not in seen and _is_importable_export(name):
+            seen.add(name)
+            exports.append(name)
+
     for t in contract.types:
-        name = t.name
         if t.kind == "primitive":
             continue  # Primitives are builtins/imports, not exports
-        if _is_importable_export(name):
-            exports.append(name)
+        add(t.name)
     for func in contract.functions:
-        name = func.name
-        if _is_importable_export(name):
-            exports.append(name)
+        add(func.name)
         for err in func.error_cases:
-            if err.error_type and err.error_type not in exports:
-                if _is_importable_export(err.error_type):
-                    exports.append(err.error_type)
+            if err.error_type:
+                add(err.error_type)
     return exports
 
 
+# Method names like TaskRegistry.__init__, or dunders.
+_INVALID_NAME_RE = re.compile(r"\.|\A(?=__).*__\Z", re.DOTALL)
+
+
 def _is_importable_export(name: str) -> bool:
     """Check if a name is a valid top-level importable export."""
-    if "." in name:  # Method names like TaskRegistry.__init__
-        return False
-    if name.startswith("__") and name.endswith("__"):  # Dunders
-        return False
-    if name in _PYTHON_BUILTINS:  # Builtins
-        return False
-    return True
+    return name not in _PYTHON_BUILTINS and not _INVALID_NAME_RE.search(name)
+
+
+# Required-exports checklist headers, emitted as one write each.
+_EXPORTS_NOTE_PY = (
+    "# ── REQUIRED EXPORTS ──────────────────────────────────\n"
+    "# Your implementation module MUST export ALL of these names\n"
+    "# with EXACTLY these spellings. Tests import them by name.\n"
+)
+_EXPORTS_NOTE_SLASH = (
+    "// -- REQUIRED EXPORTS -----------------------------------------------\n"
+    "// Your implementation module MUST export ALL of these names\n"
+    "// with EXACTLY these spellings. Tests import them by name.\n"
+)
+
+# Validator annotation, e.g. "regex(^[A-Z]{3}$)".
+_fmt_validator = "{0.kind}({0.expression})".format
+
+# Renderers stream into an io.StringIO; helpers take its bound ``write``.
+# They return the finished str rather than yielding lines: stubs are a few
+# KB, and save_contract, the one caller that writes a stub to disk, writes
+# it with a single write_text.
+_Write = Callable[[str], object]
 
 
-def render_stub(contract: ComponentContract) -> str:
+def render_stub(
+    contract: ComponentContract, exports: list[str] | None = None,
+) -> str:
     """Render a contract as a Python-style interface stub.
 
     This is the primary "mental model" artifact. It looks like code,
     not like a JSON schema. Agents consume this format far more accurately.
 
+    ``exports`` takes a precomputed get_required_exports(contract), so a
+    caller rendering several formats of one contract walks it only once.
+
     Example output:
         # === Pricing Engine (pricing) v1 ===
         # Dependencies: inventory, tax_calculator
@@ -145,182 +192,181 @@ def render_stub(contract: ComponentContract) -> str:
             \"\"\"
             ...
     """
-    lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Header
     dep_str = f"  Dependencies: {', '.join(contract.dependencies)}" if contract.dependencies else ""
-    lines.append(f"# === {contract.name} ({contract.component_id}) v{contract.version} ===")
+    write(f"# === {contract.name} ({contract.component_id}) v{contract.version} ===\n")
     if dep_str:
-        lines.append(f"#{dep_str}")
+        write(f"#{dep_str}\n")
     if contract.description:
-        lines.append(f"# {contract.description}")
-    lines.append("")
+        write(f"# {contract.description}\n")
+    write("\n")
 
     # Invariants (module-level)
     if contract.invariants:
-        lines.append("# Module invariants:")
+        write("# Module invariants:\n")
         for inv in contract.invariants:
-            lines.append(f"#   - {inv}")
-        lines.append("")
+            write(f"#   - {inv}\n")
+        write("\n")
 
     # Type definitions
     for type_spec in contract.types:
-        lines.extend(_render_type(type_spec))
-        lines.append("")
+        _render_type(type_spec, write)
+        write("\n")
 
     # Function signatures
     for func in contract.functions:
-        lines.extend(_render_function(func))
-        lines.append("")
+        _render_function(func, write)
+        write("\n")
 
     # Required exports checklist — ensures implementations export exact names
-    exports = get_required_exports(contract)
+    if exports is None:
+        exports = get_required_exports(contract)
     if exports:
-        lines.append("# ── REQUIRED EXPORTS ──────────────────────────────────")
-        lines.append("# Your implementation module MUST export ALL of these names")
-        lines.append("# with EXACTLY these spellings. Tests import them by name.")
-        lines.append(f"# __all__ = {exports}")
-        lines.append("")
+        write(f"{_EXPORTS_NOTE_PY}# __all__ = {exports}\n\n")
 
-    return "\n".join(lines)
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
 
-def _render_type(t: TypeSpec) -> list[str]:
-    """Render a single type definition."""
-    lines: list[str] = []
-
-    if t.kind == "enum":
-        lines.append(f"class {t.name}(Enum):")
-        if t.description:
-            lines.append(f'    """{t.description}"""')
-        for variant in t.variants:
-            lines.append(f'    {variant} = "{variant}"')
-        if not t.variants:
-            lines.append("    pass")
-        return lines
-
-    if t.kind == "struct":
-        lines.append(f"class {t.name}:")
-        if t.description:
-            lines.append(f'    """{t.description}"""')
-        for field in t.fields:
-            lines.append(f"    {_render_field_line(field)}")
-        if not t.fields:
-            lines.append("    pass")
-        return lines
-
-    if t.kind == "list":
-        lines.append(f"{t.name} = list[{t.item_type}]")
-        if t.description:
-            lines.append(f"# {t.description}")
-        return lines
-
-    if t.kind == "optional":
-        inner = t.inner_types[0] if t.inner_types else "Any"
-        lines.append(f"{t.name} = {inner} | None")
-        return lines
-
-    if t.kind == "union":
-        union_str = " | ".join(t.inner_types) if t.inner_types else "Any"
-        lines.append(f"{t.name} = {union_str}")
-        return lines
+def _render_enum(t: TypeSpec, write: _Write) -> None:
+    write(f"class {t.name}(Enum):\n")
+    if t.description:
+        write(f'    """{t.description}"""\n')
+    if t.variants:
+        write("".join([f'    {variant} = "{variant}"\n' for variant in t.variants]))
+    else:
+        write("    pass\n")
+
+
+def _render_struct(t: TypeSpec, write: _Write) -> None:
+    write(f"class {t.name}:\n")
+    if t.description:
+        write(f'    """{t.description}"""\n')
+    if t.fields:
+        write("".join([f"    {_render_field_line(field)}\n" for field in t.fields]))
+    else:
+        write("    pass\n")
+
+
+def _render_list(t: TypeSpec, write: _Write) -> None:
+    write(f"{t.name} = list[{t.item_type}]\n")
+    if t.description:
+        write(f"# {t.description}\n")
+
+
+def _render_optional(t: TypeSpec, write: _Write) -> None:
+    inner = t.inner_types[0] if t.inner_types else "Any"
+    write(f"{t.name} = {inner} | None\n")
 
+
+def _render_union(t: TypeSpec, write: _Write) -> None:
+    union_str = " | ".join(t.inner_types) if t.inner_types else "Any"
+    write(f"{t.name} = {union_str}\n")
+
+
+def _render_alias(t: TypeSpec, write: _Write) -> None:
     # Primitive alias
-    lines.append(f"{t.name} = {t.kind}  # {t.description}" if t.description else f"{t.name} = {t.kind}")
-    return lines
+    write(f"{t.name} = {t.kind}  # {t.description}\n" if t.description else f"{t.name} = {t.kind}\n")
 
 
-def _render_field_line(field: FieldSpec) -> str:
-    """Render a single field as a stub line with annotations."""
-    parts = [f"{field.name}: {field.type_ref}"]
+# TypeSpec.kind -> block renderer, one per language; kinds without an
+# entry render through that language's alias fallback.
+_PY_KIND_HANDLERS: dict[str, Callable[[TypeSpec, _Write], None]] = {
+    "enum": _render_enum,
+    "struct": _render_struct,
+    "list": _render_list,
+    "optional": _render_optional,
+    "union": _render_union,
+}
 
-    annotations: list[str] = []
-    if not field.required:
-        if field.default:
-            parts[0] += f" = {field.default}"
-        else:
-            parts[0] += " = None"
-        annotations.append("optional")
-    else:
-        annotations.append("required")
 
-    for v in field.validators:
-        annotations.append(f"{v.kind}({v.expression})")
+def _render_type(t: TypeSpec, write: _Write) -> None:
+    """Render a single type definition."""
+    _PY_KIND_HANDLERS.get(t.kind, _render_alias)(t, write)
+
 
+def _render_field_line(field: FieldSpec) -> str:
+    """Render a single field as a stub line with annotations."""
+    decl = f"{field.name}: {field.type_ref}"
+    if field.required:
+        comment = "required"
+    else:
+        decl += f" = {field.default}" if field.default else " = None"
+        comment = "optional"
+    if field.validators:
+        comment += ", " + ", ".join([_fmt_validator(v) for v in field.validators])
     if field.description:
-        annotations.append(field.description)
+        comment += f", {field.description}"
+    return f"{decl.ljust(40)} # {comment}"
 
-    comment = ", ".join(annotations)
-    return f"{parts[0]:40s} # {comment}"
 
+# Padding source for the aligned validator comments on parameter lines;
+# slicing avoids building a fresh run of spaces for every parameter.
+_SPACES = " " * 32
 
-def _render_function(func: FunctionContract) -> list[str]:
-    """Render a function signature with full docstring."""
-    lines: list[str] = []
+_DOC_TAIL_PY = '    Side effects: none\n    Idempotent: no\n    """\n    ...\n'
+_DOC_TAIL_IDEMPOTENT_PY = '    Side effects: none\n    Idempotent: yes\n    """\n    ...\n'
 
-    # Signature
-    params: list[str] = []
-    for inp in func.inputs:
-        p = f"    {inp.name}: {inp.type_ref}"
-        if not inp.required:
-            p += f" = {inp.default}" if inp.default else " = None"
-        # Add inline validator comment
-        if inp.validators:
-            v_str = ", ".join(f"{v.kind}({v.expression})" for v in inp.validators)
-            p += f",{' ' * max(1, 30 - len(p))}# {v_str}"
-        else:
-            p += ","
-        params.append(p)
 
+def _render_function(func: FunctionContract, write: _Write) -> None:
+    """Render a function signature with full docstring."""
+    # Signature — each parameter line is written as soon as it is built
     prefix = "async def" if func.is_async else "def"
-    if params:
-        lines.append(f"{prefix} {func.name}(")
-        lines.extend(params)
-        lines.append(f") -> {func.output_type}:")
+    if func.inputs:
+        write(f"{prefix} {func.name}(\n")
+        for inp in func.inputs:
+            p = f"    {inp.name}: {inp.type_ref}"
+            if not inp.required:
+                p += f" = {inp.default}" if inp.default else " = None"
+            # Add inline validator comment
+            if inp.validators:
+                v_str = ", ".join([_fmt_validator(v) for v in inp.validators])
+                write(f"{p},{_SPACES[:max(1, 30 - len(p))]}# {v_str}\n")
+            else:
+                write(f"{p},\n")
+        write(f") -> {func.output_type}:\n")
     else:
-        lines.append(f"{prefix} {func.name}() -> {func.output_type}:")
+        write(f"{prefix} {func.name}() -> {func.output_type}:\n")
 
-    # Docstring
-    doc_lines: list[str] = []
+    # Docstring — lines are written already indented; blank lines stay empty
+    write('    """\n')
     if func.description:
-        doc_lines.append(func.description)
-        doc_lines.append("")
+        write(f"    {func.description}\n\n")
+
+    # Scaffold functions often carry no conditions, errors or side effects;
+    # their docstring tail is fixed, so emit it in one write.
+    if not (func.preconditions or func.postconditions or func.error_cases or func.side_effects):
+        write(_DOC_TAIL_IDEMPOTENT_PY if func.idempotent else _DOC_TAIL_PY)
+        return
 
     if func.preconditions:
-        doc_lines.append("Preconditions:")
-        for pre in func.preconditions:
-            doc_lines.append(f"  - {pre}")
-        doc_lines.append("")
+        write("    Preconditions:\n")
+        write("".join([f"      - {pre}\n" for pre in func.preconditions]))
+        write("\n")
 
     if func.postconditions:
-        doc_lines.append("Postconditions:")
-        for post in func.postconditions:
-            doc_lines.append(f"  - {post}")
-        doc_lines.append("")
+        write("    Postconditions:\n")
+        write("".join([f"      - {post}\n" for post in func.postconditions]))
+        write("\n")
 
     if func.error_cases:
-        doc_lines.append("Errors:")
+        write("    Errors:\n")
         for err in func.error_cases:
-            doc_lines.append(f"  - {err.name} ({err.error_type}): {err.condition}")
+            write(f"      - {err.name} ({err.error_type}): {err.condition}\n")
             if err.error_data:
-                for k, v in err.error_data.items():
-                    doc_lines.append(f"      {k}: {v}")
-        doc_lines.append("")
+                write("".join([f"          {k}: {v}\n" for k, v in err.error_data.items()]))
+        write("\n")
 
     if func.side_effects:
-        doc_lines.append(f"Side effects: {', '.join(func.side_effects)}")
+        write(f"    Side effects: {', '.join(func.side_effects)}\n")
     else:
-        doc_lines.append("Side effects: none")
-
-    doc_lines.append(f"Idempotent: {'yes' if func.idempotent else 'no'}")
-
-    lines.append('    """')
-    for dl in doc_lines:
-        lines.append(f"    {dl}" if dl else "")
-    lines.append('    """')
-    lines.append("    ...")
+        write("    Side effects: none\n")
 
-    return lines
+    write(f"    Idempotent: {'yes' if func.idempotent else 'no'}\n")
+    write('    """\n    ...\n')
 
 
 # ── TypeScript Interface Stub Rendering ──────────────────────────────
@@ -341,6 +387,65 @@ _TS_PRIMITIVE_MAP: dict[str, str] = {
 }
 
 
+# Optional[X] / list[X] / dict[K, V] — one C-level match instead of a
+# startswith/endswith chain; the head selects a per-language handler.
+_GENERIC_TYPE_RE = re.compile(r"(Optional|list|dict)\[(.*)\]", re.DOTALL)
+
+
+def _split_type_args(inner: str) -> tuple[str, str] | None:
+    """Split ``K, V`` on the first top-level comma (nested brackets skipped)."""
+    # Flat maps (the common case) split with one C-level scan; only nested
+    # key/value types need the depth-tracking loop below.
+    if "[" not in inner and "(" not in inner:
+        key, sep, val = inner.partition(",")
+        if not sep:
+            return None
+        return key.strip(), val.strip()
+    depth = 0
+    for i, ch in enumerate(inner):
+        if ch in ("[", "("):
+            depth += 1
+        elif ch in ("]", ")"):
+            depth -= 1
+        elif ch == "," and depth == 0:
+            return inner[:i].strip(), inner[i + 1:].strip()
+    return None
+
+
+def _optional_ts(inner: str) -> str:
+    # Optional[X] -> X | undefined
+    return f"{_map_type_ts(inner)} | undefined"
+
+
+def _list_ts(inner: str) -> str:
+    # list[X] -> X[]
+    mapped = _map_type_ts(inner)
+    # Wrap union types in parens for correct precedence: (A | B)[]
+    if " | " in mapped:
+        return f"({mapped})[]"
+    return f"{mapped}[]"
+
+
+def _dict_ts(inner: str) -> str:
+    # dict[K, V] -> Record<K, V>
+    args = _split_type_args(inner)
+    if args is None:
+        return "Record<string, unknown>"
+    return f"Record<{_map_type_ts(args[0])}, {_map_type_ts(args[1])}>"
+
+
+_TS_GENERIC_HANDLERS: dict[str, Callable[[str], str]] = {
+    "Optional": _optional_ts,
+    "list": _list_ts,
+    "dict": _dict_ts,
+}
+
+
+# The cache is keyed on the type_ref string itself (lru_cache's single-str
+# fast path), so equal refs from separately parsed contracts share an entry.
+# Interning them first would only add a second hash-table lookup per call;
+# the primitive-map keys are literals and already interned.
+@functools.lru_cache(maxsize=4096)
 def _map_type_ts(type_ref: str) -> str:
     """Map a Pact type reference to its TypeScript equivalent.
 
@@ -349,42 +454,13 @@ def _map_type_ts(type_ref: str) -> str:
     user-defined types from the contract).
     """
     # Direct primitive mapping
-    if type_ref in _TS_PRIMITIVE_MAP:
-        return _TS_PRIMITIVE_MAP[type_ref]
+    mapped = _TS_PRIMITIVE_MAP.get(type_ref)
+    if mapped is not None:
+        return mapped
 
-    # Optional[X] -> X | undefined
-    if type_ref.startswith("Optional[") and type_ref.endswith("]"):
-        inner = type_ref[len("Optional["):-1]
-        return f"{_map_type_ts(inner)} | undefined"
-
-    # list[X] -> X[]
-    if type_ref.startswith("list[") and type_ref.endswith("]"):
-        inner = type_ref[len("list["):-1]
-        mapped = _map_type_ts(inner)
-        # Wrap union types in parens for correct precedence: (A | B)[]
-        if " | " in mapped:
-            return f"({mapped})[]"
-        return f"{mapped}[]"
-
-    # dict[K, V] -> Record<K, V>
-    if type_ref.startswith("dict[") and type_ref.endswith("]"):
-        inner = type_ref[len("dict["):-1]
-        # Split on first comma (handles nested types)
-        depth = 0
-        split_idx = -1
-        for i, ch in enumerate(inner):
-            if ch in ("[", "("):
-                depth += 1
-            elif ch in ("]", ")"):
-                depth -= 1
-            elif ch == "," and depth == 0:
-                split_idx = i
-                break
-        if split_idx >= 0:
-            key = inner[:split_idx].strip()
-            val = inner[split_idx + 1:].strip()
-            return f"Record<{_map_type_ts(key)}, {_map_type_ts(val)}>"
-        return "Record<string, unknown>"
+    m = _GENERIC_TYPE_RE.fullmatch(type_ref)
+    if m:
+        return _TS_GENERIC_HANDLERS[m.group(1)](m.group(2))
 
     # Union with pipe: X | Y | Z
     if " | " in type_ref:
@@ -395,12 +471,15 @@ def _map_type_ts(type_ref: str) -> str:
     return type_ref
 
 
-def render_stub_ts(contract: ComponentContract) -> str:
+def render_stub_ts(
+    contract: ComponentContract, exports: list[str] | None = None,
+) -> str:
     """Render a contract as a TypeScript interface stub.
 
     Generates idiomatic TypeScript with exported interfaces, type aliases,
     and function declarations. Uses JSDoc comments for descriptions,
-    preconditions, postconditions, and error cases.
+    preconditions, postconditions, and error cases. ``exports`` is as for
+    render_stub().
 
     Example output:
         // === Pricing Engine (pricing) v1 ===
@@ -435,127 +514,122 @@ def render_stub_ts(contract: ComponentContract) -> str:
           guest_count?: number,
         ): PriceResult;
     """
-    lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Header
     dep_str = f"  Dependencies: {', '.join(contract.dependencies)}" if contract.dependencies else ""
-    lines.append(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===")
+    write(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===\n")
     if dep_str:
-        lines.append(f"//{dep_str}")
+        write(f"//{dep_str}\n")
     if contract.description:
-        lines.append(f"// {contract.description}")
-    lines.append("")
+        write(f"// {contract.description}\n")
+    write("\n")
 
     # Invariants (module-level)
     if contract.invariants:
-        lines.append("// Module invariants:")
+        write("// Module invariants:\n")
         for inv in contract.invariants:
-            lines.append(f"//   - {inv}")
-        lines.append("")
+            write(f"//   - {inv}\n")
+        write("\n")
 
     # Type definitions
     for type_spec in contract.types:
-        lines.extend(_render_type_ts(type_spec))
-        lines.append("")
+        _render_type_ts(type_spec, write)
+        write("\n")
 
     # Function signatures
     for func in contract.functions:
-        lines.extend(_render_function_ts(func))
-        lines.append("")
+        _render_function_ts(func, write)
+        write("\n")
 
     # Required exports checklist
-    exports = get_required_exports(contract)
+    if exports is None:
+        exports = get_required_exports(contract)
     if exports:
-        lines.append("// -- REQUIRED EXPORTS -----------------------------------------------")
-        lines.append("// Your implementation module MUST export ALL of these names")
-        lines.append("// with EXACTLY these spellings. Tests import them by name.")
-        lines.append(f"// exports: {exports}")
-        lines.append("")
+        write(f"{_EXPORTS_NOTE_SLASH}// exports: {exports}\n\n")
 
-    return "\n".join(lines)
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
 
-def _render_type_ts(t: TypeSpec) -> list[str]:
-    """Render a single type definition as TypeScript."""
-    lines: list[str] = []
-
-    if t.kind == "enum":
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        if t.variants:
-            variant_strs = " | ".join(f'"{v}"' for v in t.variants)
-            lines.append(f"export type {t.name} = {variant_strs};")
-        else:
-            lines.append(f"export type {t.name} = never;")
-        return lines
-
-    if t.kind == "struct":
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export interface {t.name} {{")
-        for field in t.fields:
-            lines.append(f"  {_render_field_line_ts(field)}")
-        lines.append("}")
-        return lines
-
-    if t.kind == "list":
-        item_ts = _map_type_ts(t.item_type) if t.item_type else "unknown"
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export type {t.name} = {item_ts}[];")
-        return lines
-
-    if t.kind == "optional":
-        inner = t.inner_types[0] if t.inner_types else "unknown"
-        inner_ts = _map_type_ts(inner)
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export type {t.name} = {inner_ts} | undefined;")
-        return lines
-
-    if t.kind == "union":
-        if t.inner_types:
-            union_parts = [_map_type_ts(it) for it in t.inner_types]
-            union_str = " | ".join(union_parts)
-        else:
-            union_str = "unknown"
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export type {t.name} = {union_str};")
-        return lines
-
-    if t.kind == "map":
-        # Map types: key and value from inner_types or fallback
-        if len(t.inner_types) >= 2:
-            key_ts = _map_type_ts(t.inner_types[0])
-            val_ts = _map_type_ts(t.inner_types[1])
-        elif t.item_type:
-            key_ts = "string"
-            val_ts = _map_type_ts(t.item_type)
-        else:
-            key_ts = "string"
-            val_ts = "unknown"
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export type {t.name} = Record<{key_ts}, {val_ts}>;")
-        return lines
-
-    if t.kind == "newtype":
-        # Newtype wrapper: branded type alias
-        inner = t.inner_types[0] if t.inner_types else t.item_type or "unknown"
-        inner_ts = _map_type_ts(inner)
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"export type {t.name} = {inner_ts};")
-        return lines
+def _render_enum_ts(t: TypeSpec, write: _Write) -> None:
+    if t.description:
+        write(f"/** {t.description} */\n")
+    if t.variants:
+        variant_strs = " | ".join([f'"{v}"' for v in t.variants])
+        write(f"export type {t.name} = {variant_strs};\n")
+    else:
+        write(f"export type {t.name} = never;\n")
+
+
+def _render_struct_ts(t: TypeSpec, write: _Write) -> None:
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export interface {t.name} {{\n")
+    write("".join([f"  {_render_field_line_ts(field)}\n" for field in t.fields]))
+    write("}\n")
 
+
+def _render_list_ts(t: TypeSpec, write: _Write) -> None:
+    item_ts = _map_type_ts(t.item_type) if t.item_type else "unknown"
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = {item_ts}[];\n")
+
+
+def _render_optional_ts(t: TypeSpec, write: _Write) -> None:
+    inner = t.inner_types[0] if t.inner_types else "unknown"
+    inner_ts = _map_type_ts(inner)
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = {inner_ts} | undefined;\n")
+
+
+def _render_union_ts(t: TypeSpec, write: _Write) -> None:
+    if t.inner_types:
+        union_parts = [_map_type_ts(it) for it in t.inner_types]
+        union_str = " | ".join(union_parts)
+    else:
+        union_str = "unknown"
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = {union_str};\n")
+
+
+def _render_map_ts(t: TypeSpec, write: _Write) -> None:
+    # Map types: key and value from inner_types or fallback
+    if len(t.inner_types) >= 2:
+        key_ts = _map_type_ts(t.inner_types[0])
+        val_ts = _map_type_ts(t.inner_types[1])
+    elif t.item_type:
+        key_ts = "string"
+        val_ts = _map_type_ts(t.item_type)
+    else:
+        key_ts = "string"
+        val_ts = "unknown"
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = Record<{key_ts}, {val_ts}>;\n")
+
+
+def _render_newtype_ts(t: TypeSpec, write: _Write) -> None:
+    # Newtype wrapper: branded type alias
+    inner = t.inner_types[0] if t.inner_types else t.item_type or "unknown"
+    inner_ts = _map_type_ts(inner)
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = {inner_ts};\n")
+
+
+def _render_alias_ts(t: TypeSpec, write: _Write) -> None:
     # Primitive alias or unknown kind — render as type alias.
     # If the name itself maps to a TS primitive (e.g. name="str", kind="primitive"),
     # skip it (it's a builtin, not an export). Otherwise, try to map the item_type
     # or inner_types for a meaningful underlying type, falling back to unknown.
     if t.name in _TS_PRIMITIVE_MAP:
         # Builtin primitive — no need to emit a type alias
-        return lines
+        return
     if t.item_type:
         underlying = _map_type_ts(t.item_type)
     elif t.inner_types:
@@ -563,100 +637,87 @@ def _render_type_ts(t: TypeSpec) -> list[str]:
     else:
         underlying = "unknown"
     if t.description:
-        lines.append(f"/** {t.description} */")
-    lines.append(f"export type {t.name} = {underlying};")
-    return lines
+        write(f"/** {t.description} */\n")
+    write(f"export type {t.name} = {underlying};\n")
+
+
+_TS_KIND_HANDLERS: dict[str, Callable[[TypeSpec, _Write], None]] = {
+    "enum": _render_enum_ts,
+    "struct": _render_struct_ts,
+    "list": _render_list_ts,
+    "optional": _render_optional_ts,
+    "union": _render_union_ts,
+    "map": _render_map_ts,
+    "newtype": _render_newtype_ts,
+}
+
+
+def _render_type_ts(t: TypeSpec, write: _Write) -> None:
+    """Render a single type definition as TypeScript."""
+    _TS_KIND_HANDLERS.get(t.kind, _render_alias_ts)(t, write)
 
 
 def _render_field_line_ts(field: FieldSpec) -> str:
     """Render a single struct field as a TypeScript interface member."""
     ts_type = _map_type_ts(field.type_ref)
-    optional_mark = "" if field.required else "?"
-
-    annotations: list[str] = []
-    if not field.required:
-        annotations.append("optional")
-        if field.default:
-            annotations.append(f"default: {field.default}")
+    if field.required:
+        optional_mark = ""
+        comment = "required"
     else:
-        annotations.append("required")
-
-    for v in field.validators:
-        annotations.append(f"{v.kind}({v.expression})")
-
+        optional_mark = "?"
+        comment = f"optional, default: {field.default}" if field.default else "optional"
+    if field.validators:
+        comment += ", " + ", ".join([_fmt_validator(v) for v in field.validators])
     if field.description:
-        annotations.append(field.description)
-
-    comment = ", ".join(annotations)
+        comment += f", {field.description}"
     return f"{field.name}{optional_mark}: {ts_type};  // {comment}"
 
 
-def _render_function_ts(func: FunctionContract) -> list[str]:
+def _render_function_ts(func: FunctionContract, write: _Write) -> None:
     """Render a function signature as a TypeScript declaration with JSDoc."""
-    lines: list[str] = []
-
-    # Build JSDoc comment
-    jsdoc_lines: list[str] = []
+    # JSDoc comment
+    write("/**\n")
     if func.description:
-        jsdoc_lines.append(f" * {func.description}")
-        jsdoc_lines.append(" *")
+        write(f" * {func.description}\n *\n")
 
     if func.preconditions:
-        for pre in func.preconditions:
-            jsdoc_lines.append(f" * @precondition {pre}")
+        write("".join([f" * @precondition {pre}\n" for pre in func.preconditions]))
 
     if func.postconditions:
-        for post in func.postconditions:
-            jsdoc_lines.append(f" * @postcondition {post}")
+        write("".join([f" * @postcondition {post}\n" for post in func.postconditions]))
 
     if func.error_cases:
         for err in func.error_cases:
-            err_line = f" * @throws {err.name} ({err.error_type}) - {err.condition}"
-            jsdoc_lines.append(err_line)
+            write(f" * @throws {err.name} ({err.error_type}) - {err.condition}\n")
             if err.error_data:
-                for k, v in err.error_data.items():
-                    jsdoc_lines.append(f" *   {k}: {v}")
+                write("".join([f" *   {k}: {v}\n" for k, v in err.error_data.items()]))
 
     if func.side_effects:
-        jsdoc_lines.append(f" * @sideEffects {', '.join(func.side_effects)}")
+        write(f" * @sideEffects {', '.join(func.side_effects)}\n")
     else:
-        jsdoc_lines.append(" * @sideEffects none")
+        write(" * @sideEffects none\n")
 
-    jsdoc_lines.append(f" * @idempotent {'yes' if func.idempotent else 'no'}")
-
-    if jsdoc_lines:
-        lines.append("/**")
-        for jl in jsdoc_lines:
-            lines.append(jl)
-        lines.append(" */")
+    write(f" * @idempotent {'yes' if func.idempotent else 'no'}\n */\n")
 
     # Function signature
     return_ts = _map_type_ts(func.output_type)
+    ret_type = f"Promise<{return_ts}>" if func.is_async else return_ts
+    async_prefix = "async " if func.is_async else ""
+
+    if not func.inputs:
+        write(f"export {async_prefix}function {func.name}(): {ret_type};\n")
+        return
 
-    params: list[str] = []
+    write(f"export {async_prefix}function {func.name}(\n")
     for inp in func.inputs:
-        ts_type = _map_type_ts(inp.type_ref)
         optional_mark = "" if inp.required else "?"
-        p = f"  {inp.name}{optional_mark}: {ts_type}"
-        # Add inline validator comment
+        # Inline validator comment
         if inp.validators:
-            v_str = ", ".join(f"{v.kind}({v.expression})" for v in inp.validators)
-            p += f",  // {v_str}"
+            v_str = ", ".join([_fmt_validator(v) for v in inp.validators])
+            write(f"  {inp.name}{optional_mark}: {_map_type_ts(inp.type_ref)},  // {v_str}\n")
         else:
-            p += ","
-        params.append(p)
-
-    async_prefix = "async " if func.is_async else ""
-    if params:
-        lines.append(f"export {async_prefix}function {func.name}(")
-        lines.extend(params)
-        ret_type = f"Promise<{return_ts}>" if func.is_async else return_ts
-        lines.append(f"): {ret_type};")
-    else:
-        ret_type = f"Promise<{return_ts}>" if func.is_async else return_ts
-        lines.append(f"export {async_prefix}function {func.name}(): {ret_type};")
-
-    return lines
+            write(f"  {inp.name}{optional_mark}: {_map_type_ts(inp.type_ref)},\n")
+    write(f"): {ret_type};\n")
 
 
 def render_log_key_preamble_ts(key: str) -> str:
@@ -685,39 +746,41 @@ _JS_PRIMITIVE_MAP: dict[str, str] = {
 }
 
 
+def _optional_js(inner: str) -> str:
+    return f"({_map_type_js(inner)}|undefined)"
+
+
+def _list_js(inner: str) -> str:
+    return f"Array<{_map_type_js(inner)}>"
+
+
+def _dict_js(inner: str) -> str:
+    args = _split_type_args(inner)
+    if args is None:
+        return "Object<string, *>"
+    return f"Object<{_map_type_js(args[0])}, {_map_type_js(args[1])}>"
+
+
+_JS_GENERIC_HANDLERS: dict[str, Callable[[str], str]] = {
+    "Optional": _optional_js,
+    "list": _list_js,
+    "dict": _dict_js,
+}
+
+
+@functools.lru_cache(maxsize=4096)
 def _map_type_js(type_ref: str) -> str:
     """Map a Pact type reference to a JSDoc type string.
 
     Uses JSDoc conventions: {string}, {number}, {Array<X>}, {Object<K,V>}.
     """
-    if type_ref in _JS_PRIMITIVE_MAP:
-        return _JS_PRIMITIVE_MAP[type_ref]
+    mapped = _JS_PRIMITIVE_MAP.get(type_ref)
+    if mapped is not None:
+        return mapped
 
-    if type_ref.startswith("Optional[") and type_ref.endswith("]"):
-        inner = type_ref[len("Optional["):-1]
-        return f"({_map_type_js(inner)}|undefined)"
-
-    if type_ref.startswith("list[") and type_ref.endswith("]"):
-        inner = type_ref[len("list["):-1]
-        return f"Array<{_map_type_js(inner)}>"
-
-    if type_ref.startswith("dict[") and type_ref.endswith("]"):
-        inner = type_ref[len("dict["):-1]
-        depth = 0
-        split_idx = -1
-        for i, ch in enumerate(inner):
-            if ch in ("[", "("):
-                depth += 1
-            elif ch in ("]", ")"):
-                depth -= 1
-            elif ch == "," and depth == 0:
-                split_idx = i
-                break
-        if split_idx >= 0:
-            key = inner[:split_idx].strip()
-            val = inner[split_idx + 1:].strip()
-            return f"Object<{_map_type_js(key)}, {_map_type_js(val)}>"
-        return "Object<string, *>"
+    m = _GENERIC_TYPE_RE.fullmatch(type_ref)
+    if m:
+        return _JS_GENERIC_HANDLERS[m.group(1)](m.group(2))
 
     if " | " in type_ref:
         parts = [_map_type_js(p.strip()) for p in type_ref.split(" | ")]
@@ -726,135 +789,139 @@ def _map_type_js(type_ref: str) -> str:
     return type_ref
 
 
-def render_stub_js(contract: ComponentContract) -> str:
+def render_stub_js(
+    contract: ComponentContract, exports: list[str] | None = None,
+) -> str:
     """Render a contract as a JavaScript JSDoc interface stub.
 
     Uses JSDoc @typedef, @param, and @returns for type documentation.
     Functions are declared without type annotations but with full JSDoc.
+    ``exports`` is as for render_stub().
     """
-    lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Header
     dep_str = f"  Dependencies: {', '.join(contract.dependencies)}" if contract.dependencies else ""
-    lines.append(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===")
+    write(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===\n")
     if dep_str:
-        lines.append(f"//{dep_str}")
+        write(f"//{dep_str}\n")
     if contract.description:
-        lines.append(f"// {contract.description}")
-    lines.append("")
+        write(f"// {contract.description}\n")
+    write("\n")
 
     # Invariants
     if contract.invariants:
-        lines.append("// Module invariants:")
+        write("// Module invariants:\n")
         for inv in contract.invariants:
-            lines.append(f"//   - {inv}")
-        lines.append("")
+            write(f"//   - {inv}\n")
+        write("\n")
 
     # Type definitions as JSDoc @typedef
     for type_spec in contract.types:
-        lines.extend(_render_type_js(type_spec))
-        lines.append("")
+        _render_type_js(type_spec, write)
+        write("\n")
 
     # Function signatures with JSDoc
     for func in contract.functions:
-        lines.extend(_render_function_js(func))
-        lines.append("")
+        _render_function_js(func, write)
+        write("\n")
 
     # Required exports checklist
-    exports = get_required_exports(contract)
+    if exports is None:
+        exports = get_required_exports(contract)
     if exports:
-        lines.append("// -- REQUIRED EXPORTS -----------------------------------------------")
-        lines.append("// Your implementation module MUST export ALL of these names")
-        lines.append("// with EXACTLY these spellings. Tests import them by name.")
-        lines.append(f"// exports: {exports}")
-        lines.append("")
+        write(f"{_EXPORTS_NOTE_SLASH}// exports: {exports}\n\n")
 
-    return "\n".join(lines)
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
 
-def _render_type_js(t: TypeSpec) -> list[str]:
-    """Render a single type definition as JSDoc."""
-    lines: list[str] = []
-
-    if t.kind == "enum":
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        if t.variants:
-            variant_strs = " | ".join(f'"{v}"' for v in t.variants)
-            lines.append(f"/** @typedef {{{variant_strs}}} {t.name} */")
-        else:
-            lines.append(f"/** @typedef {{never}} {t.name} */")
-        return lines
-
-    if t.kind == "struct":
-        lines.append("/**")
-        if t.description:
-            lines.append(f" * {t.description}")
-        lines.append(f" * @typedef {{{t.name}}} {t.name}")
-        for field in t.fields:
-            js_type = _map_type_js(field.type_ref)
-            optional = "" if field.required else "["
-            close = "" if field.required else "]"
-            lines.append(f" * @property {{{js_type}}} {optional}{field.name}{close}")
-        lines.append(" */")
-        return lines
-
-    if t.kind == "list":
-        item_js = _map_type_js(t.item_type) if t.item_type else "*"
-        if t.description:
-            lines.append(f"/** {t.description} */")
-        lines.append(f"/** @typedef {{Array<{item_js}>}} {t.name} */")
-        return lines
+def _render_enum_js(t: TypeSpec, write: _Write) -> None:
+    if t.description:
+        write(f"/** {t.description} */\n")
+    if t.variants:
+        variant_strs = " | ".join([f'"{v}"' for v in t.variants])
+        write(f"/** @typedef {{{variant_strs}}} {t.name} */\n")
+    else:
+        write(f"/** @typedef {{never}} {t.name} */\n")
 
+
+def _render_struct_js(t: TypeSpec, write: _Write) -> None:
+    write("/**\n")
+    if t.description:
+        write(f" * {t.description}\n")
+    write(f" * @typedef {{{t.name}}} {t.name}\n")
+    for field in t.fields:
+        js_type = _map_type_js(field.type_ref)
+        optional = "" if field.required else "["
+        close = "" if field.required else "]"
+        write(f" * @property {{{js_type}}} {optional}{field.name}{close}\n")
+    write(" */\n")
+
+
+def _render_list_js(t: TypeSpec, write: _Write) -> None:
+    item_js = _map_type_js(t.item_type) if t.item_type else "*"
+    if t.description:
+        write(f"/** {t.description} */\n")
+    write(f"/** @typedef {{Array<{item_js}>}} {t.name} */\n")
+
+
+def _render_alias_js(t: TypeSpec, write: _Write) -> None:
     # Fallback for other kinds
     if t.description:
-        lines.append(f"/** {t.description} */")
-    lines.append(f"/** @typedef {{*}} {t.name} */")
-    return lines
+        write(f"/** {t.description} */\n")
+    write(f"/** @typedef {{*}} {t.name} */\n")
 
 
-def _render_function_js(func: FunctionContract) -> list[str]:
-    """Render a function as a JSDoc-documented declaration."""
-    lines: list[str] = []
+_JS_KIND_HANDLERS: dict[str, Callable[[TypeSpec, _Write], None]] = {
+    "enum": _render_enum_js,
+    "struct": _render_struct_js,
+    "list": _render_list_js,
+}
+
 
+def _render_type_js(t: TypeSpec, write: _Write) -> None:
+    """Render a single type definition as JSDoc."""
+    _JS_KIND_HANDLERS.get(t.kind, _render_alias_js)(t, write)
+
+
+def _render_function_js(func: FunctionContract, write: _Write) -> None:
+    """Render a function as a JSDoc-documented declaration."""
     # Build JSDoc
-    lines.append("/**")
+    write("/**\n")
     if func.description:
-        lines.append(f" * {func.description}")
-        lines.append(" *")
+        write(f" * {func.description}\n *\n")
 
+    # One pass over the inputs yields both the @param tags and the names
+    # for the signature below.
+    param_names: list[str] = []
     for inp in func.inputs:
-        js_type = _map_type_js(inp.type_ref)
-        lines.append(f" * @param {{{js_type}}} {inp.name}")
+        write(f" * @param {{{_map_type_js(inp.type_ref)}}} {inp.name}\n")
+        param_names.append(inp.name)
 
     return_type = _map_type_js(func.output_type)
-    lines.append(f" * @returns {{{return_type}}}")
+    write(f" * @returns {{{return_type}}}\n")
 
     if func.preconditions:
-        for pre in func.preconditions:
-            lines.append(f" * @precondition {pre}")
+        write("".join([f" * @precondition {pre}\n" for pre in func.preconditions]))
 
     if func.postconditions:
-        for post in func.postconditions:
-            lines.append(f" * @postcondition {post}")
+        write("".join([f" * @postcondition {post}\n" for post in func.postconditions]))
 
     if func.error_cases:
         for err in func.error_cases:
-            lines.append(f" * @throws {err.name} ({err.error_type}) - {err.condition}")
+            write(f" * @throws {err.name} ({err.error_type}) - {err.condition}\n")
 
     if func.side_effects:
-        lines.append(f" * @sideEffects {', '.join(func.side_effects)}")
+        write(f" * @sideEffects {', '.join(func.side_effects)}\n")
     else:
-        lines.append(" * @sideEffects none")
+        write(" * @sideEffects none\n")
 
-    lines.append(f" * @idempotent {'yes' if func.idempotent else 'no'}")
-    lines.append(" */")
+    write(f" * @idempotent {'yes' if func.idempotent else 'no'}\n */\n")
 
     # Function signature (no type annotations)
-    params = ", ".join(inp.name for inp in func.inputs)
-    lines.append(f"export function {func.name}({params}) {{}}")
-
-    return lines
+    write(f"export function {func.name}({', '.join(param_names)}) {{}}\n")
 
 
 def render_log_key_preamble_js(key: str) -> str:
@@ -904,21 +971,9 @@ def _map_type_rust(type_ref: str) -> str:
     # dict[K, V] -> HashMap<K, V>
     if type_ref.startswith("dict[") and type_ref.endswith("]"):
         inner = type_ref[len("dict["):-1]
-        # Split on first comma (handles nested types)
-        depth = 0
-        split_idx = -1
-        for i, ch in enumerate(inner):
-            if ch in ("[", "("):
-                depth += 1
-            elif ch in ("]", ")"):
-                depth -= 1
-            elif ch == "," and depth == 0:
-                split_idx = i
-                break
-        if split_idx >= 0:
-            key = inner[:split_idx].strip()
-            val = inner[split_idx + 1:].strip()
-            return f"std::collections::HashMap<{_map_type_rust(key)}, {_map_type_rust(val)}>"
+        args = _split_type_args(inner)
+        if args is not None:
+            return f"std::collections::HashMap<{_map_type_rust(args[0])}, {_map_type_rust(args[1])}>"
         return "std::collections::HashMap<String, serde_json::Value>"
 
     # Union with pipe: X | Y | Z -> not directly representable, use enum or first type
@@ -936,12 +991,15 @@ def _map_type_rust(type_ref: str) -> str:
     return type_ref
 
 
-def render_stub_rust(contract: ComponentContract) -> str:
+def render_stub_rust(
+    contract: ComponentContract, exports: list[str] | None = None,
+) -> str:
     """Render a contract as a Rust interface stub.
 
     Generates idiomatic Rust with pub structs, enums, and function signatures.
     Uses doc comments (///) for descriptions, preconditions, postconditions,
-    and error cases. Structs derive common traits.
+    and error cases. Structs derive common traits. ``exports`` is as for
+    render_stub().
 
     Example output:
         // === Pricing Engine (pricing) v1 ===
@@ -993,132 +1051,123 @@ def render_stub_rust(contract: ComponentContract) -> str:
             todo!()
         }
     """
-    lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Header
     dep_str = f"  Dependencies: {', '.join(contract.dependencies)}" if contract.dependencies else ""
-    lines.append(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===")
+    write(f"// === {contract.name} ({contract.component_id}) v{contract.version} ===\n")
     if dep_str:
-        lines.append(f"//{dep_str}")
+        write(f"//{dep_str}\n")
     if contract.description:
-        lines.append(f"// {contract.description}")
-    lines.append("")
+        write(f"// {contract.description}\n")
+    write("\n")
 
     # Common imports
-    lines.append("use serde::{Deserialize, Serialize};")
-    lines.append("use thiserror::Error;")
-    lines.append("")
+    write("use serde::{Deserialize, Serialize};\nuse thiserror::Error;\n\n")
 
     # Invariants (module-level)
     if contract.invariants:
-        lines.append("// Module invariants:")
+        write("// Module invariants:\n")
         for inv in contract.invariants:
-            lines.append(f"//   - {inv}")
-        lines.append("")
+            write(f"//   - {inv}\n")
+        write("\n")
 
     # Type definitions
     for type_spec in contract.types:
-        lines.extend(_render_type_rust(type_spec))
-        lines.append("")
+        _render_type_rust(type_spec, write)
+        write("\n")
 
     # Function signatures
     for func in contract.functions:
-        lines.extend(_render_function_rust(func))
-        lines.append("")
+        _render_function_rust(func, write)
+        write("\n")
 
     # Required exports checklist
-    exports = get_required_exports(contract)
+    if exports is None:
+        exports = get_required_exports(contract)
     if exports:
-        lines.append("// -- REQUIRED EXPORTS -----------------------------------------------")
-        lines.append("// Your implementation module MUST export ALL of these names")
-        lines.append("// with EXACTLY these spellings. Tests import them by name.")
-        lines.append(f"// exports: {exports}")
-        lines.append("")
+        write(f"{_EXPORTS_NOTE_SLASH}// exports: {exports}\n\n")
 
-    return "\n".join(lines)
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
 
-def _render_type_rust(t: TypeSpec) -> list[str]:
-    """Render a single type definition as Rust."""
-    lines: list[str] = []
-
-    if t.kind == "enum":
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append("#[derive(Debug, Clone, PartialEq, Serialize, Deserialize)]")
-        lines.append(f"pub enum {t.name} {{")
-        for variant in t.variants:
-            lines.append(f"    {variant},")
-        if not t.variants:
-            # Empty enum — add a placeholder
-            lines.append("    // no variants defined")
-        lines.append("}")
-        return lines
-
-    if t.kind == "struct":
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append("#[derive(Debug, Clone, Serialize, Deserialize)]")
-        lines.append(f"pub struct {t.name} {{")
-        for field in t.fields:
-            lines.append(f"    {_render_field_line_rust(field)}")
-        lines.append("}")
-        return lines
-
-    if t.kind == "list":
-        item_rs = _map_type_rust(t.item_type) if t.item_type else "serde_json::Value"
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append(f"pub type {t.name} = Vec<{item_rs}>;")
-        return lines
-
-    if t.kind == "optional":
-        inner = t.inner_types[0] if t.inner_types else "serde_json::Value"
-        inner_rs = _map_type_rust(inner)
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append(f"pub type {t.name} = Option<{inner_rs}>;")
-        return lines
-
-    if t.kind == "union":
-        # Rust unions are best modeled as enums; emit a type alias with a comment
-        if t.description:
-            lines.append(f"/// {t.description}")
-        if t.inner_types:
-            lines.append(f"// Union of: {', '.join(t.inner_types)}")
-            lines.append("// Consider modeling as an enum with variants for each type")
-            # Use first type as alias for now
-            lines.append(f"pub type {t.name} = {_map_type_rust(t.inner_types[0])};")
-        else:
-            lines.append(f"pub type {t.name} = serde_json::Value;")
-        return lines
-
-    if t.kind == "map":
-        if len(t.inner_types) >= 2:
-            key_rs = _map_type_rust(t.inner_types[0])
-            val_rs = _map_type_rust(t.inner_types[1])
-        elif t.item_type:
-            key_rs = "String"
-            val_rs = _map_type_rust(t.item_type)
-        else:
-            key_rs = "String"
-            val_rs = "serde_json::Value"
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append(f"pub type {t.name} = std::collections::HashMap<{key_rs}, {val_rs}>;")
-        return lines
-
-    if t.kind == "newtype":
-        inner = t.inner_types[0] if t.inner_types else t.item_type or "serde_json::Value"
-        inner_rs = _map_type_rust(inner)
-        if t.description:
-            lines.append(f"/// {t.description}")
-        lines.append(f"pub struct {t.name}(pub {inner_rs});")
-        return lines
+def _render_enum_rust(t: TypeSpec, write: _Write) -> None:
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"#[derive(Debug, Clone, PartialEq, Serialize, Deserialize)]\npub enum {t.name} {{\n")
+    if t.variants:
+        write("".join([f"    {variant},\n" for variant in t.variants]))
+    else:
+        # Empty enum — add a placeholder
+        write("    // no variants defined\n")
+    write("}\n")
+
+
+def _render_struct_rust(t: TypeSpec, write: _Write) -> None:
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"#[derive(Debug, Clone, Serialize, Deserialize)]\npub struct {t.name} {{\n")
+    write("".join([f"    {_render_field_line_rust(field)}\n" for field in t.fields]))
+    write("}\n")
+
+
+def _render_list_rust(t: TypeSpec, write: _Write) -> None:
+    item_rs = _map_type_rust(t.item_type) if t.item_type else "serde_json::Value"
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"pub type {t.name} = Vec<{item_rs}>;\n")
+
+
+def _render_optional_rust(t: TypeSpec, write: _Write) -> None:
+    inner = t.inner_types[0] if t.inner_types else "serde_json::Value"
+    inner_rs = _map_type_rust(inner)
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"pub type {t.name} = Option<{inner_rs}>;\n")
 
+
+def _render_union_rust(t: TypeSpec, write: _Write) -> None:
+    # Rust unions are best modeled as enums; emit a type alias with a comment
+    if t.description:
+        write(f"/// {t.description}\n")
+    if t.inner_types:
+        write(f"// Union of: {', '.join(t.inner_types)}\n")
+        write("// Consider modeling as an enum with variants for each type\n")
+        # Use first type as alias for now
+        write(f"pub type {t.name} = {_map_type_rust(t.inner_types[0])};\n")
+    else:
+        write(f"pub type {t.name} = serde_json::Value;\n")
+
+
+def _render_map_rust(t: TypeSpec, write: _Write) -> None:
+    if len(t.inner_types) >= 2:
+        key_rs = _map_type_rust(t.inner_types[0])
+        val_rs = _map_type_rust(t.inner_types[1])
+    elif t.item_type:
+        key_rs = "String"
+        val_rs = _map_type_rust(t.item_type)
+    else:
+        key_rs = "String"
+        val_rs = "serde_json::Value"
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"pub type {t.name} = std::collections::HashMap<{key_rs}, {val_rs}>;\n")
+
+
+def _render_newtype_rust(t: TypeSpec, write: _Write) -> None:
+    inner = t.inner_types[0] if t.inner_types else t.item_type or "serde_json::Value"
+    inner_rs = _map_type_rust(inner)
+    if t.description:
+        write(f"/// {t.description}\n")
+    write(f"pub struct {t.name}(pub {inner_rs});\n")
+
+
+def _render_alias_rust(t: TypeSpec, write: _Write) -> None:
     # Primitive alias or unknown kind
     if t.name in _RUST_PRIMITIVE_MAP:
-        return lines
+        return
     if t.item_type:
         underlying = _map_type_rust(t.item_type)
     elif t.inner_types:
@@ -1126,76 +1175,73 @@ def _render_type_rust(t: TypeSpec) -> list[str]:
     else:
         underlying = "serde_json::Value"
     if t.description:
-        lines.append(f"/// {t.description}")
-    lines.append(f"pub type {t.name} = {underlying};")
-    return lines
+        write(f"/// {t.description}\n")
+    write(f"pub type {t.name} = {underlying};\n")
+
+
+_RUST_KIND_HANDLERS: dict[str, Callable[[TypeSpec, _Write], None]] = {
+    "enum": _render_enum_rust,
+    "struct": _render_struct_rust,
+    "list": _render_list_rust,
+    "optional": _render_optional_rust,
+    "union": _render_union_rust,
+    "map": _render_map_rust,
+    "newtype": _render_newtype_rust,
+}
+
+
+def _render_type_rust(t: TypeSpec, write: _Write) -> None:
+    """Render a single type definition as Rust."""
+    _RUST_KIND_HANDLERS.get(t.kind, _render_alias_rust)(t, write)
 
 
 def _render_field_line_rust(field: FieldSpec) -> str:
     """Render a single struct field as a Rust struct member."""
     rs_type = _map_type_rust(field.type_ref)
 
-    # Optional fields become Option<T>
-    if not field.required:
-        rs_type = f"Option<{rs_type}>"
-
-    annotations: list[str] = []
-    if not field.required:
-        annotations.append("optional")
-        if field.default:
-            annotations.append(f"default: {field.default}")
+    if field.required:
+        comment = "required"
     else:
-        annotations.append("required")
-
-    for v in field.validators:
-        annotations.append(f"{v.kind}({v.expression})")
-
+        # Optional fields become Option<T>
+        rs_type = f"Option<{rs_type}>"
+        comment = f"optional, default: {field.default}" if field.default else "optional"
+    if field.validators:
+        comment += ", " + ", ".join([_fmt_validator(v) for v in field.validators])
     if field.description:
-        annotations.append(field.description)
-
-    comment = ", ".join(annotations)
+        comment += f", {field.description}"
     return f"/// {comment}\n    pub {field.name}: {rs_type},"
 
 
-def _render_function_rust(func: FunctionContract) -> list[str]:
+def _render_function_rust(func: FunctionContract, write: _Write) -> None:
     """Render a function signature as a Rust declaration with doc comments."""
-    lines: list[str] = []
-
-    # Build doc comment
-    doc_lines: list[str] = []
+    # Doc comment
     if func.description:
-        doc_lines.append(f"/// {func.description}")
-        doc_lines.append("///")
+        write(f"/// {func.description}\n///\n")
 
     if func.preconditions:
-        doc_lines.append("/// Preconditions:")
-        for pre in func.preconditions:
-            doc_lines.append(f"///   - {pre}")
-        doc_lines.append("///")
+        write("/// Preconditions:\n")
+        write("".join([f"///   - {pre}\n" for pre in func.preconditions]))
+        write("///\n")
 
     if func.postconditions:
-        doc_lines.append("/// Postconditions:")
-        for post in func.postconditions:
-            doc_lines.append(f"///   - {post}")
-        doc_lines.append("///")
+        write("/// Postconditions:\n")
+        write("".join([f"///   - {post}\n" for post in func.postconditions]))
+        write("///\n")
 
     if func.error_cases:
-        doc_lines.append("/// Errors:")
+        write("/// Errors:\n")
         for err in func.error_cases:
-            doc_lines.append(f"///   - {err.name} ({err.error_type}): {err.condition}")
+            write(f"///   - {err.name} ({err.error_type}): {err.condition}\n")
             if err.error_data:
-                for k, v in err.error_data.items():
-                    doc_lines.append(f"///       {k}: {v}")
-        doc_lines.append("///")
+                write("".join([f"///       {k}: {v}\n" for k, v in err.error_data.items()]))
+        write("///\n")
 
     if func.side_effects:
-        doc_lines.append(f"/// Side effects: {', '.join(func.side_effects)}")
+        write(f"/// Side effects: {', '.join(func.side_effects)}\n")
     else:
-        doc_lines.append("/// Side effects: none")
-
-    doc_lines.append(f"/// Idempotent: {'yes' if func.idempotent else 'no'}")
+        write("/// Side effects: none\n")
 
-    lines.extend(doc_lines)
+    write(f"/// Idempotent: {'yes' if func.idempotent else 'no'}\n")
 
     # Function signature
     return_rs = _map_type_rust(func.output_type)
@@ -1203,23 +1249,6 @@ def _render_function_rust(func: FunctionContract) -> list[str]:
     # Determine if we need Result wrapping (if there are error cases)
     has_errors = bool(func.error_cases)
 
-    params: list[str] = []
-    for inp in func.inputs:
-        rs_type = _map_type_rust(inp.type_ref)
-        # Use references for string inputs (idiomatic Rust)
-        if rs_type == "String":
-            rs_type = "&str"
-        if not inp.required:
-            rs_type = f"Option<{rs_type}>"
-        p = f"    {inp.name}: {rs_type}"
-        # Add inline validator comment
-        if inp.validators:
-            v_str = ", ".join(f"{v.kind}({v.expression})" for v in inp.validators)
-            p += f",  // {v_str}"
-        else:
-            p += ","
-        params.append(p)
-
     # Wrap return type in Result if there are error cases
     if has_errors:
         # Find the primary error type name from error cases
@@ -1233,17 +1262,26 @@ def _render_function_rust(func: FunctionContract) -> list[str]:
         ret_type = return_rs
 
     async_prefix = "async " if func.is_async else ""
-    if params:
-        lines.append(f"pub {async_prefix}fn {func.name}(")
-        lines.extend(params)
-        lines.append(f") -> {ret_type} {{")
+    if func.inputs:
+        write(f"pub {async_prefix}fn {func.name}(\n")
+        for inp in func.inputs:
+            rs_type = _map_type_rust(inp.type_ref)
+            # Use references for string inputs (idiomatic Rust)
+            if rs_type == "String":
+                rs_type = "&str"
+            if not inp.required:
+                rs_type = f"Option<{rs_type}>"
+            # Add inline validator comment
+            if inp.validators:
+                v_str = ", ".join([_fmt_validator(v) for v in inp.validators])
+                write(f"    {inp.name}: {rs_type},  // {v_str}\n")
+            else:
+                write(f"    {inp.name}: {rs_type},\n")
+        write(f") -> {ret_type} {{\n")
     else:
-        lines.append(f"pub {async_prefix}fn {func.name}() -> {ret_type} {{")
+        write(f"pub {async_prefix}fn {func.name}() -> {ret_type} {{\n")
 
-    lines.append("    todo!()")
-    lines.append("}")
-
-    return lines
+    write("    todo!()\n}\n")
 
 
 def render_log_key_preamble_rust(key: str) -> str:
@@ -1290,36 +1328,42 @@ def render_dependency_map(
     if not contract:
         return f"# No contract found for {component_id}"
 
-    lines = [f"# Available dependencies for: {component_id}", ""]
-
+    buf = io.StringIO()
+    write = buf.write
+    write(f"# Available dependencies for: {component_id}\n\n")
     for dep_id in contract.dependencies:
         dep = contracts.get(dep_id)
         if not dep:
-            lines.append(f"## {dep_id} — NOT FOUND")
-            lines.append("")
+            write(f"## {dep_id} — NOT FOUND\n\n")
             continue
+        _render_dependency_entry(dep_id, dep, write)
 
-        lines.append(f"## {dep.name} ({dep_id}) v{dep.version}")
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
-        # Compact type summary
-        for t in dep.types:
-            if t.kind == "struct" and t.fields:
-                fields_str = ", ".join(f"{f.name}: {f.type_ref}" for f in t.fields)
-                lines.append(f"  type {t.name} {{ {fields_str} }}")
-            elif t.kind == "enum" and t.variants:
-                lines.append(f"  enum {t.name} {{ {', '.join(t.variants)} }}")
 
-        # Compact function signatures
-        for func in dep.functions:
-            inputs_str = ", ".join(f"{i.name}: {i.type_ref}" for i in func.inputs)
-            errors_str = ""
-            if func.error_cases:
-                errors_str = f"\n    errors: {', '.join(e.name for e in func.error_cases)}"
-            lines.append(f"  {func.name}({inputs_str}) -> {func.output_type}{errors_str}")
+def _render_dependency_entry(dep_id: str, dep: ComponentContract, write: _Write) -> None:
+    """Render one dependency's section of render_dependency_map (blank-line terminated)."""
+    join = ", ".join
+    write(f"## {dep.name} ({dep_id}) v{dep.version}\n")
 
-        lines.append("")
+    # Compact type summary
+    for t in dep.types:
+        kind = t.kind
+        if kind == "struct" and t.fields:
+            write(f"  type {t.name} {{ {join([f'{f.name}: {f.type_ref}' for f in t.fields])} }}\n")
+        elif kind == "enum" and t.variants:
+            write(f"  enum {t.name} {{ {join(t.variants)} }}\n")
 
-    return "\n".join(lines)
+    # Compact function signatures
+    for func in dep.functions:
+        inputs_str = join([f"{i.name}: {i.type_ref}" for i in func.inputs])
+        write(f"  {func.name}({inputs_str}) -> {func.output_type}\n")
+        error_cases = func.error_cases
+        if error_cases:
+            write(f"    errors: {join([e.name for e in error_cases])}\n")
+
+    write("\n")
 
 
 def render_compact_deps(contracts: dict[str, ComponentContract]) -> str:
@@ -1337,34 +1381,50 @@ def render_compact_deps(contracts: dict[str, ComponentContract]) -> str:
     if not contracts:
         return ""
 
-    parts = []
+    # Serial on purpose: a section renders in microseconds, less than it
+    # costs to pickle its contract to a worker process.
+    buf = io.StringIO()
+    write = buf.write
     for comp_id, contract in contracts.items():
-        lines = [f"## {contract.name} ({comp_id})"]
-
-        # Function signatures
-        for func in contract.functions:
-            inputs = ", ".join(f"{i.name}: {i.type_ref}" for i in func.inputs)
-            lines.append(f"{func.name}({inputs}) -> {func.output_type}")
-
-        # Type shapes (compact)
-        for typedef in contract.types:
-            if typedef.fields:
-                field_strs = ", ".join(f"{f.name}: {f.type_ref}" for f in typedef.fields)
-                lines.append(f"{typedef.name} = {{{field_strs}}}")
-            elif typedef.kind == "enum":
-                variants = ", ".join(v for v in (typedef.variants or []))
-                lines.append(f"{typedef.name} = enum({variants})")
-            else:
-                lines.append(f"{typedef.name} = {typedef.kind}")
+        _render_compact_dep(comp_id, contract, write)
+        write("\n")
 
-        parts.append("\n".join(lines))
+    # Sections are separated by a blank line; drop the trailing one.
+    return buf.getvalue()[:-2]
+
+
+def render_compact_stub(contract: ComponentContract) -> str:
+    """Compact form of a single contract: its render_compact_deps() section."""
+    buf = io.StringIO()
+    _render_compact_dep(contract.component_id, contract, buf.write)
+    return buf.getvalue()[:-1]
 
-    return "\n\n".join(parts)
+
+def _render_compact_dep(comp_id: str, contract: ComponentContract, write: _Write) -> None:
+    """Render one contract's section of render_compact_deps."""
+    join = ", ".join
+    write(f"## {contract.name} ({comp_id})\n")
+
+    # Function signatures
+    for func in contract.functions:
+        inputs = join([f"{i.name}: {i.type_ref}" for i in func.inputs])
+        write(f"{func.name}({inputs}) -> {func.output_type}\n")
+
+    # Type shapes (compact)
+    for typedef in contract.types:
+        fields = typedef.fields
+        if fields:
+            write(f"{typedef.name} = {{{join([f'{f.name}: {f.type_ref}' for f in fields])}}}\n")
+        elif typedef.kind == "enum":
+            write(f"{typedef.name} = enum({join(typedef.variants or [])})\n")
+        else:
+            write(f"{typedef.name} = {typedef.kind}\n")
 
 
 # ── Log Key Preamble ─────────────────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=1024)
 def render_log_key_preamble(
     project_id: str,
     component_id: str,
@@ -1375,6 +1435,8 @@ def render_log_key_preamble(
     Returns Python code that sets up a logger with the embedded key.
     The key format is PREFIX:project_hash:component_id and appears in
     every log line, enabling automatic error attribution by the Sentinel.
+    Results are memoized per (project, component, prefix); the f-string
+    itself is a single BUILD_STRING over constant pieces.
     """
     key = f"{prefix}:{project_id}:{component_id}"
     return f'''import logging
@@ -1397,14 +1459,29 @@ def _log(level: str, msg: str, **kwargs) -> None:
 '''
 
 
+@functools.lru_cache(maxsize=256)
 def project_id_hash(project_dir: str) -> str:
-    """Generate a 6-char project ID hash from a project directory path."""
+    """Generate a 6-char project ID hash from a project directory path.
+
+    The value is baked into log keys in already-generated code, so the
+    algorithm must stay SHA-256 for keys to keep matching.
+    """
     return hashlib.sha256(project_dir.encode()).hexdigest()[:6]
 
 
 # ── Handoff Brief ────────────────────────────────────────────────────
 
 
+# Language -> (stub renderer, code fence tag) for handoff briefs and
+# code-agent context.
+_STUB_RENDERERS: dict[str, tuple[Callable[[ComponentContract], str], str]] = {
+    "typescript": (render_stub_ts, "typescript"),
+    "javascript": (render_stub_js, "javascript"),
+    "rust": (render_stub_rust, "rust"),
+}
+_DEFAULT_STUB_RENDERER = (render_stub, "python")
+
+
 def context_fence(processing_register: str = "", strategic_context: str = "") -> str:
     """Generate a context fence: reset + register prime + domain prime.
 
@@ -1454,6 +1531,8 @@ def render_handoff_brief(
     max_context_tokens: int = 0,
     tool_index_context: str = "",
     language: str = "python",
+    stub_mode: Literal["full", "compact"] = "full",
+    stub: str = "",
 ) -> str:
     """Render a complete handoff document for a fresh agent.
 
@@ -1471,165 +1550,152 @@ def render_handoff_brief(
         max_context_tokens: If >0, apply tiered compression to keep the brief
             within this token budget. Tier 1 is never truncated.
         language: Target language for stub rendering (python, typescript, javascript, rust).
+        stub_mode: "full" embeds the language stub; "compact" embeds only
+            signatures and type shapes (render_compact_stub) to save tokens.
+        stub: Already-rendered full stub for ``language``, so a caller that
+            also builds a code-agent context renders it once. Rendered here
+            when empty; unused in compact mode.
     """
     # ── Tier 1: Context fence + domain primer (never truncated) ──
+    # Each tier streams into its own buffer; every block ends with a blank
+    # separator line, and the final newline is dropped when the tier is read.
 
-    tier1_lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Context fence: reset + register + strategic context
-    fence = context_fence(processing_register, strategic_context)
-    tier1_lines.append(fence)
-    tier1_lines.append("")
+    write(f"{context_fence(processing_register, strategic_context)}\n\n")
 
     # Mission (conversational, not rigid header)
-    tier1_lines.append(f"You are implementing {contract.name} ({component_id}), attempt {attempt}.")
-    tier1_lines.append("")
+    write(f"You are implementing {contract.name} ({component_id}), attempt {attempt}.\n\n")
 
     # Interface stub — the domain primer. This is the most important content.
     # Paper XX: 15 tokens of domain-matched content capture 98.8% of benefit.
     # Dispatch to language-specific stub renderer
-    _stub_renderers = {
-        "typescript": (render_stub_ts, "typescript"),
-        "javascript": (render_stub_js, "javascript"),
-        "rust": (render_stub_rust, "rust"),
-    }
-    stub_renderer, code_fence_lang = _stub_renderers.get(language, (render_stub, "python"))
-
-    tier1_lines.append("Here is the interface contract you need to implement:")
-    tier1_lines.append(f"```{code_fence_lang}")
-    tier1_lines.append(stub_renderer(contract))
-    tier1_lines.append("```")
-    tier1_lines.append("")
+    stub_renderer, code_fence_lang = _STUB_RENDERERS.get(language, _DEFAULT_STUB_RENDERER)
+    if stub_mode == "compact":
+        stub = render_compact_stub(contract)
+    elif not stub:
+        stub = stub_renderer(contract)
+    stub_fence = "" if stub_mode == "compact" else code_fence_lang
+
+    write(
+        "Here is the interface contract you need to implement:\n"
+        f"```{stub_fence}\n{stub}\n```\n\n"
+    )
 
     # Log key preamble (production traceability — part of the contract)
     if log_key_preamble:
-        tier1_lines.append("Include this logging preamble at the top of every module:")
-        tier1_lines.append(f"```{code_fence_lang}")
-        tier1_lines.append(log_key_preamble)
-        tier1_lines.append("```")
-        tier1_lines.append("")
+        write(
+            "Include this logging preamble at the top of every module:\n"
+            f"```{code_fence_lang}\n{log_key_preamble}\n```\n\n"
+        )
 
-    tier1 = "\n".join(tier1_lines)
+    tier1 = buf.getvalue()[:-1]
     used_tokens = _estimate_tokens(tier1)
 
     # ── Tier 2: Task specification (tests, dependencies, failures) ──
 
-    tier2_lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     # Global standards
     if standards_brief:
-        tier2_lines.append(standards_brief)
-        tier2_lines.append("")
+        write(f"{standards_brief}\n\n")
 
     # Tool index context (ctags/tree-sitter/kindex enrichment)
     if tool_index_context:
-        tier2_lines.append(tool_index_context)
-        tier2_lines.append("")
+        write(f"{tool_index_context}\n\n")
 
     # Dependencies
     if contract.dependencies:
-        tier2_lines.append("Your available dependencies:")
-        tier2_lines.append("```")
-        tier2_lines.append(render_dependency_map(component_id, contracts))
-        tier2_lines.append("```")
-        tier2_lines.append("")
+        write(
+            "Your available dependencies:\n"
+            f"```\n{render_dependency_map(component_id, contracts)}\n```\n\n"
+        )
 
     # Tests to pass
     if test_suite:
         if include_test_code:
-            tier2_lines.append(
-                f"Your implementation needs to pass these {len(test_suite.test_cases)} tests:"
+            write(f"Your implementation needs to pass these {len(test_suite.test_cases)} tests:\n")
+            failed_ids = (
+                frozenset([f.test_id for f in test_results.failure_details])
+                if test_results else frozenset()
             )
             for tc in test_suite.test_cases:
-                marker = ""
-                if test_results and test_results.failure_details:
-                    failed_ids = {f.test_id for f in test_results.failure_details}
-                    if tc.id in failed_ids:
-                        marker = " [PREVIOUSLY FAILED]"
-                tier2_lines.append(f"  - [{tc.category}] {tc.id}: {tc.description}{marker}")
-            tier2_lines.append("")
+                marker = " [PREVIOUSLY FAILED]" if tc.id in failed_ids else ""
+                write(f"  - [{tc.category}] {tc.id}: {tc.description}{marker}\n")
+            write("\n")
 
             if test_suite.generated_code:
-                tier2_lines.append("Test code:")
-                tier2_lines.append("```python")
-                tier2_lines.append(test_suite.generated_code)
-                tier2_lines.append("```")
-                tier2_lines.append("")
+                write(f"Test code:\n```python\n{test_suite.generated_code}\n```\n\n")
         else:
             if test_suite.test_cases:
-                tier2_lines.append(
-                    f"Your implementation needs to pass these {len(test_suite.test_cases)} tests:"
-                )
+                write(f"Your implementation needs to pass these {len(test_suite.test_cases)} tests:\n")
                 for tc in test_suite.test_cases:
                     desc = tc.description or ""
-                    tier2_lines.append(f"- {tc.id}: {desc}")
-            tier2_lines.append("")
+                    write(f"- {tc.id}: {desc}\n")
+            write("\n")
 
     # Prior failures
     if prior_failures:
-        tier2_lines.append("Previous attempts failed — avoid repeating these mistakes:")
+        write("Previous attempts failed — avoid repeating these mistakes:\n")
         for i, failure in enumerate(prior_failures, 1):
-            tier2_lines.append(f"  {i}. {failure}")
-        tier2_lines.append("")
+            write(f"  {i}. {failure}\n")
+        write("\n")
 
     if test_results and not test_results.all_passed:
-        tier2_lines.append(
+        write(
             f"Last test run: {test_results.passed} of {test_results.total} passed. "
-            f"Specific failures:"
+            f"Specific failures:\n"
         )
         for fd in test_results.failure_details[:5]:
-            tier2_lines.append(f"  - {fd.test_id}: {fd.error_message}")
-        tier2_lines.append("")
+            write(f"  - {fd.test_id}: {fd.error_message}\n")
+        write("\n")
 
-    tier2 = "\n".join(tier2_lines)
+    tier2 = buf.getvalue()[:-1]
     tier2_tokens = _estimate_tokens(tier2)
 
     # ── Tier 3: Supplementary context (learnings, shaping, SOPs) ──
     # Paper XX: content beyond domain priming saturation is noise.
     # These are lowest priority — trimmed first if over budget.
 
-    tier3_lines: list[str] = []
+    buf = io.StringIO()
+    write = buf.write
 
     if pitch_context:
-        tier3_lines.append("Shaping context for this component:")
-        tier3_lines.append(pitch_context)
-        tier3_lines.append("")
+        write(f"Shaping context for this component:\n{pitch_context}\n\n")
 
     if external_context:
-        tier3_lines.append(external_context)
-        tier3_lines.append("")
+        write(f"{external_context}\n\n")
 
     if learnings:
-        tier3_lines.append(learnings)
-        tier3_lines.append("")
+        write(f"{learnings}\n\n")
 
     if sops:
-        tier3_lines.append("Follow these operating procedures:")
-        tier3_lines.append(sops)
-        tier3_lines.append("")
+        write(f"Follow these operating procedures:\n{sops}\n\n")
 
-    tier3 = "\n".join(tier3_lines)
+    tier3 = buf.getvalue()[:-1]
     tier3_tokens = _estimate_tokens(tier3)
 
     # ── Assemble with tiered compression ──
+    # Tiers are joined in one allocation; chained + would copy tier1 twice.
 
     if max_context_tokens > 0:
         remaining = max_context_tokens - used_tokens
         if remaining >= tier2_tokens + tier3_tokens:
             # Everything fits
-            return tier1 + tier2 + tier3
+            return "".join((tier1, tier2, tier3))
         elif remaining >= tier2_tokens:
             # Tier 2 fits, truncate tier 3
             tier3_budget = remaining - tier2_tokens
-            tier3 = _truncate_to_tokens(tier3, tier3_budget)
-            return tier1 + tier2 + tier3
+            return "".join((tier1, tier2, _truncate_to_tokens(tier3, tier3_budget)))
         else:
             # Only tier 1 + partial tier 2
-            tier2 = _truncate_to_tokens(tier2, remaining)
-            return tier1 + tier2
+            return tier1 + _truncate_to_tokens(tier2, remaining)
 
     # No budget — include everything
-    return tier1 + tier2 + tier3
+    return "".join((tier1, tier2, tier3))
 
 
 def _truncate_to_tokens(text: str, max_tokens: int) -> str:
@@ -1652,6 +1718,12 @@ def _truncate_to_tokens(text: str, max_tokens: int) -> str:
 # ── Progress Snapshot ────────────────────────────────────────────────
 
 
+_STATUS_ICONS = {
+    "pending": "[ ]", "contracted": "[C]",
+    "implemented": "[I]", "tested": "[+]", "failed": "[X]",
+}
+
+
 def render_progress_snapshot(
     state: RunState,
     tree: DecompositionTree | None = None,
@@ -1662,25 +1734,21 @@ def render_progress_snapshot(
     This is what gets read when the scheduler wakes up or when a human
     wants to understand current state at a glance.
     """
-    lines = [
-        "# PROGRESS SNAPSHOT",
-        f"Run: {state.id} | Phase: {state.phase} | Status: {state.status}",
-        f"Cost: ${state.total_cost_usd:.4f} | Tokens: {state.total_tokens:,}",
-        "",
-    ]
+    buf = io.StringIO()
+    write = buf.write
+    write(
+        "# PROGRESS SNAPSHOT\n"
+        f"Run: {state.id} | Phase: {state.phase} | Status: {state.status}\n"
+        f"Cost: ${state.total_cost_usd:.4f} | Tokens: {state.total_tokens:,}\n\n"
+    )
 
     if state.pause_reason:
-        lines.append(f"PAUSED: {state.pause_reason}")
-        lines.append("")
+        write(f"PAUSED: {state.pause_reason}\n\n")
 
     if tree:
-        lines.append("## Components:")
-        for node_id in tree.topological_order():
-            node = tree.nodes[node_id]
-            icon = {
-                "pending": "[ ]", "contracted": "[C]",
-                "implemented": "[I]", "tested": "[+]", "failed": "[X]",
-            }.get(node.implementation_status, "[?]")
+        write("## Components:\n")
+        for _, node in tree.topological_items():
+            icon = _STATUS_ICONS.get(node.implementation_status, "[?]")
             test_info = ""
             if node.test_results:
                 tr = node.test_results
@@ -1688,19 +1756,25 @@ def render_progress_snapshot(
             dep_info = ""
             if node.children:
                 dep_info = f" -> [{', '.join(node.children)}]"
-            lines.append(f"  {icon} {node.name} ({node.component_id}){dep_info}{test_info}")
-        lines.append("")
+            write(f"  {icon} {node.name} ({node.component_id}){dep_info}{test_info}\n")
+        write("\n")
 
     if state.component_tasks:
-        active = [t for t in state.component_tasks if t.status == "implementing"]
-        failed = [t for t in state.component_tasks if t.status == "failed"]
+        active: list[str] = []
+        failed: list[str] = []
+        for t in state.component_tasks:
+            if t.status == "implementing":
+                active.append(t.component_id)
+            elif t.status == "failed":
+                failed.append(f"{t.component_id} ({t.last_error[:50]})")
         if active:
-            lines.append(f"Active: {', '.join(t.component_id for t in active)}")
+            write(f"Active: {', '.join(active)}\n")
         if failed:
-            lines.append(f"Failed: {', '.join(f'{t.component_id} ({t.last_error[:50]})' for t in failed)}")
-        lines.append("")
+            write(f"Failed: {', '.join(failed)}\n")
+        write("\n")
 
-    return "\n".join(lines)
+    # Every section ends with a blank separator; drop the last newline.
+    return buf.getvalue()[:-1]
 
 
 # ── Context Compression ─────────────────────────────────────────────
@@ -1718,6 +1792,8 @@ def build_code_agent_context(
     research: list[dict] | None = None,
     max_tokens: int = 8000,
     language: str = "python",
+    estimator: Callable[[str], int] | None = None,
+    stub: str = "",
 ) -> str:
     """Build tiered context for code generation agent.
 
@@ -1729,80 +1805,67 @@ def build_code_agent_context(
       - Result fits within max_tokens (estimated)
       - Tier 1 is never truncated
       - Tier 2 and 3 are truncated gracefully if needed
+
+    Args:
+        estimator: Token counter for the target model's tokenizer (e.g. a
+            tiktoken encoder's ``lambda s: len(enc.encode(s))``). Defaults
+            to the ~4 chars/token heuristic of _estimate_tokens.
+        stub: Already-rendered stub for ``language`` (e.g. the one passed to
+            render_handoff_brief). Rendered here when empty.
     """
-    sections: list[str] = []
-    used_tokens = 0
+    estimator = estimator or _estimate_tokens
+    # All three tiers go into one list joined once at the end.
+    parts: list[str] = []
 
     # Tier 1: Always include contract stub and test code
-    _stub_renderers = {
-        "typescript": (render_stub_ts, "typescript"),
-        "javascript": (render_stub_js, "javascript"),
-        "rust": (render_stub_rust, "rust"),
-    }
-    stub_renderer, code_fence_lang = _stub_renderers.get(language, (render_stub, "python"))
-    stub = stub_renderer(contract)
-    tier1_parts = [
-        "## CONTRACT",
-        f"```{code_fence_lang}",
-        stub,
-        "```",
-    ]
+    stub_renderer, code_fence_lang = _STUB_RENDERERS.get(language, _DEFAULT_STUB_RENDERER)
+    parts.append(f"## CONTRACT\n```{code_fence_lang}\n{stub or stub_renderer(contract)}\n```")
     if test_suite.generated_code:
-        tier1_parts.extend([
-            "",
-            "## TESTS TO PASS",
-            "```python",
-            test_suite.generated_code,
-            "```",
-        ])
+        parts.append(f"\n## TESTS TO PASS\n```python\n{test_suite.generated_code}\n```")
     elif test_suite.test_cases:
-        tier1_parts.append("")
-        tier1_parts.append("## TEST CASES")
+        parts.append("\n## TEST CASES")
         for tc in test_suite.test_cases:
-            tier1_parts.append(f"- [{tc.category}] {tc.id}: {tc.description}")
-
-    tier1 = "\n".join(tier1_parts)
-    used_tokens = _estimate_tokens(tier1)
-    sections.append(tier1)
+            parts.append(f"- [{tc.category}] {tc.id}: {tc.description}")
 
+    used_tokens = estimator("\n".join(parts))
     remaining = max_tokens - used_tokens
 
     # Tier 2: Decisions (if room)
     if decisions and remaining > 100:
-        decisions_text_parts = ["", "## DECISIONS"]
+        parts.append("\n## DECISIONS")
         for d in decisions:
             line = f"- {d}"
-            line_tokens = _estimate_tokens(line)
+            line_tokens = estimator(line)
             if used_tokens + line_tokens > max_tokens - 50:
-                decisions_text_parts.append("- ... (truncated)")
+                parts.append("- ... (truncated)")
                 break
-            decisions_text_parts.append(line)
+            parts.append(line)
             used_tokens += line_tokens
-        decisions_text = "\n".join(decisions_text_parts)
-        sections.append(decisions_text)
         remaining = max_tokens - used_tokens
 
     # Tier 3: Research summary (if room)
     if research and remaining > 100:
-        research_parts = ["", "## RESEARCH SUMMARY"]
+        research_lines: list[str] = []
         for item in research:
             topic = item.get("topic", "")
             finding = item.get("finding", "")
             if topic and finding:
                 # Summarize: just topic + first sentence of finding
-                first_sentence = finding.split(".")[0] + "." if "." in finding else finding
+                head, sep, _ = finding.partition(".")
+                first_sentence = head + sep if sep else finding
                 line = f"- **{topic}**: {first_sentence}"
             elif topic:
                 line = f"- {topic}"
             else:
                 continue
-            line_tokens = _estimate_tokens(line)
+            line_tokens = estimator(line)
             if used_tokens + line_tokens > max_tokens - 20:
-                research_parts.append("- ... (truncated)")
+                research_lines.append("- ... (truncated)")
                 break
-            research_parts.append(line)
+            research_lines.append(line)
             used_tokens += line_tokens
-        if len(research_parts) > 1:  # More than just the header
-            sections.append("\n".join(research_parts))
+        if research_lines:  # Header only when some item made it in
+            parts.append("\n## RESEARCH SUMMARY")
+            parts.extend(research_lines)
 
-    return "\n".join(sections)
+    return "\n".join(parts)
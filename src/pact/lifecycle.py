@@ -16,13 +16,17 @@ Phase transitions:
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
+from collections import Counter
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import StrEnum
-from uuid import uuid4
+from secrets import token_hex
 
-from pact.schemas import RunState
+from pact.schemas import ComponentTask, RunState
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +34,7 @@ logger = logging.getLogger(__name__)
 def create_run(project_dir: str) -> RunState:
     """Create a new RunState."""
     return RunState(
-        id=uuid4().hex[:12],
+        id=token_hex(6),
         project_dir=project_dir,
         status="active",
         phase="interview",
@@ -38,6 +42,14 @@ def create_run(project_dir: str) -> RunState:
     )
 
 
+_PHASE_ORDER: tuple[str, ...] = (
+    "interview", "shape", "decompose", "contract",
+    "preflight", "implement", "integrate", "arbiter",
+    "polish", "retrospective", "complete",
+)
+_PHASE_INDEX: dict[str, int] = {phase: i for i, phase in enumerate(_PHASE_ORDER)}
+
+
 def advance_phase(state: RunState, skip_phases: set[str] | None = None) -> str:
     """Advance to the next phase. Returns the new phase name.
 
@@ -46,24 +58,19 @@ def advance_phase(state: RunState, skip_phases: set[str] | None = None) -> str:
         skip_phases: Optional set of phase names to skip over.
             If the next phase is in this set, keep advancing.
     """
-    phase_order = [
-        "interview", "shape", "decompose", "contract",
-        "preflight", "implement", "integrate", "arbiter",
-        "polish", "retrospective", "complete",
-    ]
-    try:
-        idx = phase_order.index(state.phase)
-    except ValueError:
+    idx = _PHASE_INDEX.get(state.phase)
+    if idx is None:
         # In diagnose or unknown phase, return to implement
         state.phase = "implement"
         return state.phase
 
-    if idx < len(phase_order) - 1:
+    last = len(_PHASE_ORDER) - 1
+    if idx < last:
         idx += 1
         # Skip over phases in the skip set
-        while skip_phases and idx < len(phase_order) - 1 and phase_order[idx] in skip_phases:
+        while skip_phases and idx < last and _PHASE_ORDER[idx] in skip_phases:
             idx += 1
-        state.phase = phase_order[idx]
+        state.phase = _PHASE_ORDER[idx]
     return state.phase
 
 
@@ -81,10 +88,12 @@ def format_run_summary(state: RunState) -> str:
         f"  Project: {state.project_dir}",
     ]
     if state.component_tasks:
-        completed = sum(1 for t in state.component_tasks if t.status == "completed")
-        failed = sum(1 for t in state.component_tasks if t.status == "failed")
+        # One pass tallies every status
+        counts = Counter([t.status for t in state.component_tasks])
         total = len(state.component_tasks)
-        lines.append(f"  Components: {completed}/{total} done, {failed} failed")
+        lines.append(
+            f"  Components: {counts['completed']}/{total} done, {counts['failed']} failed"
+        )
     if state.pause_reason:
         lines.append(f"  Reason: {state.pause_reason}")
 
@@ -104,7 +113,7 @@ def format_run_summary(state: RunState) -> str:
     return "\n".join(lines)
 
 
-@dataclass
+@dataclass(slots=True)
 class ResumeStrategy:
     """Computed strategy for resuming a failed/paused run."""
     last_checkpoint: str  # Component ID of last successful checkpoint
@@ -170,6 +179,20 @@ class ErrorClassification(StrEnum):
     SYSTEMIC = "systemic"     # Same error across components -> escalate
 
 
+_TRANSIENT_ERROR_TYPES = (
+    asyncio.TimeoutError,
+    ConnectionError,
+    ConnectionResetError,
+    ConnectionRefusedError,
+    ConnectionAbortedError,
+)
+
+# httpx transient errors, matched by class name (avoid hard import dependency)
+_HTTPX_TRANSIENT_NAMES = frozenset({
+    "ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "ConnectTimeout",
+})
+
+
 def classify_error(error: Exception, context: dict | None = None) -> ErrorClassification:
     """Classify an error for retry/stop/escalate decision.
 
@@ -183,38 +206,40 @@ def classify_error(error: Exception, context: dict | None = None) -> ErrorClassi
         - If context["component_errors"] shows 3+ components with same error type -> SYSTEMIC
         - Unknown errors default to PERMANENT (fail safe)
     """
-    import asyncio
-
     # Check systemic first (needs context)
     if context and "component_errors" in context:
         comp_errors = context["component_errors"]
         if len(comp_errors) >= 3:
-            # Check if all have the same error type
-            error_types = [type(e).__name__ for e in comp_errors.values()] if isinstance(list(comp_errors.values())[0], Exception) else list(comp_errors.values())
-            from collections import Counter
-            counts = Counter(error_types)
-            most_common_type, most_common_count = counts.most_common(1)[0]
-            if most_common_count >= 3:
-                return ErrorClassification.SYSTEMIC
+            # Systemic as soon as any one error type reaches 3 components.
+            # Values are exception instances or error type names.
+            counts: dict[str, int] = {}
+            for err in comp_errors.values():
+                name = type(err).__name__ if isinstance(err, Exception) else err
+                n = counts[name] = counts.get(name, 0) + 1
+                if n >= 3:
+                    return ErrorClassification.SYSTEMIC
+
+    return _classify_error_type(type(error))
+
+
+@functools.lru_cache(maxsize=256)
+def _classify_error_type(error_type: type) -> ErrorClassification:
+    """Transient/permanent decision for an exception class.
 
+    Depends only on the class, so retry storms of one error type are
+    classified once.
+    """
     # Transient errors (retriable)
-    transient_types = (
-        asyncio.TimeoutError,
-        ConnectionError,
-        ConnectionResetError,
-        ConnectionRefusedError,
-        ConnectionAbortedError,
-    )
-    if isinstance(error, transient_types):
+    if issubclass(error_type, _TRANSIENT_ERROR_TYPES):
         return ErrorClassification.TRANSIENT
 
     # Check for OSError with network-related errno
-    if isinstance(error, OSError) and not isinstance(error, (FileNotFoundError, PermissionError)):
+    if issubclass(error_type, OSError) and not issubclass(error_type, (FileNotFoundError, PermissionError)):
         return ErrorClassification.TRANSIENT
 
     # Check for httpx errors by class name (avoid hard import dependency)
-    error_class_name = type(error).__name__
-    if error_class_name in ("ConnectError", "ReadTimeout", "WriteTimeout", "PoolTimeout", "ConnectTimeout"):
+    error_class_name = error_type.__name__
+    if error_class_name in _HTTPX_TRANSIENT_NAMES:
         return ErrorClassification.TRANSIENT
 
     # Permanent errors (non-retriable)
@@ -225,6 +250,103 @@ def classify_error(error: Exception, context: dict | None = None) -> ErrorClassi
 # ── Event Sourcing ───────────────────────────────────────────────────
 
 
+# Phases a replayed build entry moves past (builds imply implement or later).
+_PRE_IMPLEMENT_PHASES = frozenset({"interview", "shape", "decompose", "contract"})
+
+
+def _replay_interview(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    # Interview completed — advance past interview.
+    # If detail mentions questions remaining we still advance;
+    # the presence of the audit entry means the phase executed.
+    state.phase = "shape"
+
+
+def _replay_shape(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    # Shape completed (or errored) — advance to decompose.
+    state.phase = "decompose"
+
+
+def _replay_decompose(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    # Decomposition produced component tasks.
+    # Detail may list component IDs; we don't parse them here
+    # because the build entries will create tasks as needed.
+    state.phase = "contract"
+
+
+def _replay_build(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    # Detail format: "comp_id: N/M passed"
+    detail = entry.get("detail", "")
+    comp_id, _, result_part = detail.partition(":")
+    comp_id = comp_id.strip()
+    result_part = result_part.strip()
+
+    # Parse pass/total from "N/M passed"
+    all_passed = False
+    if "passed" in result_part:
+        fraction = result_part.split("passed")[0].strip()
+        if "/" in fraction:
+            passed_str, total_str = fraction.split("/", 1)
+            try:
+                passed_count = int(passed_str.strip())
+                total_count = int(total_str.strip())
+                all_passed = (passed_count == total_count and total_count > 0)
+            except ValueError:
+                pass
+
+    # Find or create the component task
+    task = tasks.get(comp_id)
+    if task is None:
+        task = tasks[comp_id] = ComponentTask(component_id=comp_id)
+        state.component_tasks.append(task)
+
+    task.attempts += 1
+    if all_passed:
+        task.status = "completed"
+    else:
+        task.status = "failed"
+        task.last_error = detail
+
+    # Move phase to at least implement
+    if state.phase in _PRE_IMPLEMENT_PHASES:
+        state.phase = "implement"
+
+
+def _replay_systemic_failure(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    state.status = "paused"
+    state.pause_reason = entry.get("detail", "")
+
+
+def _replay_informational(
+    state: RunState, entry: dict, tasks: dict[str, ComponentTask],
+) -> None:
+    # "archive", "phase_start" and unknown actions — no state change.
+    pass
+
+
+# Audit action -> state update applied when replaying that entry. Handlers
+# share a component_id -> task index so build entries find their task in O(1).
+_REPLAY_HANDLERS: dict[
+    str, Callable[[RunState, dict, dict[str, ComponentTask]], None]
+] = {
+    "interview": _replay_interview,
+    "shape": _replay_shape,
+    "shape_error": _replay_shape,
+    "decompose": _replay_decompose,
+    "build": _replay_build,
+    "systemic_failure": _replay_systemic_failure,
+}
+
+
 def rebuild_state_from_audit(audit_entries: list[dict], project_dir: str) -> RunState:
     """Rebuild RunState by replaying audit entries.
 
@@ -241,73 +363,12 @@ def rebuild_state_from_audit(audit_entries: list[dict], project_dir: str) -> Run
 
     Returns a best-effort reconstructed RunState. If no entries, returns a fresh state.
     """
-    from pact.schemas import ComponentTask
-
     state = create_run(project_dir)
+    handlers = _REPLAY_HANDLERS
+    tasks: dict[str, ComponentTask] = {}
 
     for entry in audit_entries:
-        action = entry.get("action", "")
-        detail = entry.get("detail", "")
-
-        if action == "interview":
-            # Interview completed — advance past interview.
-            # If detail mentions questions remaining we still advance;
-            # the presence of the audit entry means the phase executed.
-            state.phase = "shape"
-
-        elif action in ("shape", "shape_error"):
-            # Shape completed (or errored) — advance to decompose.
-            state.phase = "decompose"
-
-        elif action == "decompose":
-            # Decomposition produced component tasks.
-            # Detail may list component IDs; we don't parse them here
-            # because the build entries will create tasks as needed.
-            state.phase = "contract"
-
-        elif action == "build":
-            # Detail format: "comp_id: N/M passed"
-            comp_id, _, result_part = detail.partition(":")
-            comp_id = comp_id.strip()
-            result_part = result_part.strip()
-
-            # Parse pass/total from "N/M passed"
-            all_passed = False
-            if "passed" in result_part:
-                fraction = result_part.split("passed")[0].strip()
-                if "/" in fraction:
-                    passed_str, total_str = fraction.split("/", 1)
-                    try:
-                        passed_count = int(passed_str.strip())
-                        total_count = int(total_str.strip())
-                        all_passed = (passed_count == total_count and total_count > 0)
-                    except ValueError:
-                        pass
-
-            # Find or create the component task
-            existing = [t for t in state.component_tasks if t.component_id == comp_id]
-            if existing:
-                task = existing[0]
-            else:
-                task = ComponentTask(component_id=comp_id)
-                state.component_tasks.append(task)
-
-            task.attempts += 1
-            if all_passed:
-                task.status = "completed"
-            else:
-                task.status = "failed"
-                task.last_error = detail
-
-            # Move phase to at least implement
-            if state.phase in ("interview", "shape", "decompose", "contract"):
-                state.phase = "implement"
-
-        elif action == "systemic_failure":
-            state.status = "paused"
-            state.pause_reason = detail
-
-        # "archive" and "phase_start" are informational — no state change.
+        handlers.get(entry.get("action", ""), _replay_informational)(state, entry, tasks)
 
     return state
 
@@ -333,25 +394,19 @@ def compute_audit_delta(current_state: RunState, audit_entries: list[dict]) -> l
             f"audit-reconstructed={reconstructed.status}"
         )
 
-    # Compare component task counts
-    persisted_completed = sum(
-        1 for t in current_state.component_tasks if t.status == "completed"
-    )
-    reconstructed_completed = sum(
-        1 for t in reconstructed.component_tasks if t.status == "completed"
-    )
+    # Compare component task counts; one pass tallies each side's statuses
+    persisted = Counter([t.status for t in current_state.component_tasks])
+    rebuilt = Counter([t.status for t in reconstructed.component_tasks])
+    persisted_completed = persisted["completed"]
+    reconstructed_completed = rebuilt["completed"]
     if persisted_completed != reconstructed_completed:
         discrepancies.append(
             f"Completed component count mismatch: persisted={persisted_completed}, "
             f"audit-reconstructed={reconstructed_completed}"
         )
 
-    persisted_failed = sum(
-        1 for t in current_state.component_tasks if t.status == "failed"
-    )
-    reconstructed_failed = sum(
-        1 for t in reconstructed.component_tasks if t.status == "failed"
-    )
+    persisted_failed = persisted["failed"]
+    reconstructed_failed = rebuilt["failed"]
     if persisted_failed != reconstructed_failed:
         discrepancies.append(
             f"Failed component count mismatch: persisted={persisted_failed}, "
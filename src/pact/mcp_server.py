@@ -140,7 +140,7 @@ class PactMCPServer:
             contract = pm.load_contract(component_id)
             if not contract:
                 return {"error": f"Contract not found: {component_id}"}
-            return json.loads(contract.model_dump_json())
+            return contract.model_dump(mode="json")
         except Exception as e:
             return {"error": f"Failed to load contract: {e}"}
 
@@ -45,8 +45,9 @@ in the project tree. Only ephemeral per-run state lives in .pact/:
       │   ├── metadata.json
       │   ├── test_results.json
       │   └── attempts/
-      └── compositions/<parent_id>/
-          └── test_results.json
+      ├── compositions/<parent_id>/
+      │   └── test_results.json
+      └── integration/<parent_id>__<hash>.json  # Passing integration cache
 """
 
 from __future__ import annotations
@@ -117,6 +118,32 @@ checklist.json linguist-generated=true
 """
 
 
+def _audit_entry(action: str, detail: str, extra: dict[str, str]) -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "action": action,
+        "detail": detail,
+        **extra,
+    }
+
+
+class AuditBatch:
+    """Audit entries buffered by ``ProjectManager.audit_batch()``."""
+
+    def __init__(self, write: Callable[[list[dict]], None]) -> None:
+        self.entries: list[dict] = []
+        self._write = write
+
+    def append(self, action: str, detail: str = "", **kwargs: str) -> None:
+        self.entries.append(_audit_entry(action, detail, kwargs))
+
+    def flush(self) -> None:
+        """Write the buffered entries now and start a fresh buffer."""
+        if self.entries:
+            self._write(self.entries)
+            self.entries = []
+
+
 class ProjectManager:
     """Manages project directory lifecycle."""
 
@@ -528,16 +555,32 @@ class ProjectManager:
         that may exceed PIPE_BUF (rare; structured kwargs are short) and
         gives a single, easy-to-reason-about contract.
         """
+        self._write_audit_entries([_audit_entry(action, detail, kwargs)])
+
+    @contextlib.contextmanager
+    def audit_batch(self):
+        """Buffer audit entries and append them with a single locked write.
+
+        Yields an ``AuditBatch`` whose ``append`` mirrors ``append_audit``.
+        Each entry is timestamped when appended; pending entries are flushed
+        on exit, including when the block raises. Callers with long-running
+        steps should ``flush()`` at step boundaries so a killed process loses
+        at most the current step. One lock + open + write replaces one per
+        entry, which matters when parallel integrations contend for the
+        audit file.
+        """
+        batch = AuditBatch(self._write_audit_entries)
+        try:
+            yield batch
+        finally:
+            batch.flush()
+
+    def _write_audit_entries(self, entries: list[dict]) -> None:
         self._pact_dir.mkdir(parents=True, exist_ok=True)
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "action": action,
-            "detail": detail,
-            **kwargs,
-        }
+        payload = "".join(json.dumps(entry) + "\n" for entry in entries)
         with self._file_lock("audit"):
             with open(self.audit_path, "a") as f:
-                f.write(json.dumps(entry) + "\n")
+                f.write(payload)
 
     def load_audit(self) -> list[dict]:
         if not self.audit_path.exists():
@@ -901,6 +944,11 @@ class ProjectManager:
         d.mkdir(parents=True, exist_ok=True)
         return d
 
+    @property
+    def integration_cache_dir(self) -> Path:
+        """Passing integrations keyed by input hash: .pact/integration/."""
+        return self._pact_dir / "integration"
+
     # ── Learnings ──────────────────────────────────────────────────
 
     def append_learning(self, entry: dict) -> None:
@@ -561,8 +561,12 @@ class DecompositionTree(BaseModel):
         Visits ALL nodes, not just those reachable from root,
         to handle trees with orphaned subtrees.
         """
+        return [node_id for node_id, _ in self.topological_items()]
+
+    def topological_items(self) -> list[tuple[str, DecompositionNode]]:
+        """Return (component_id, node) pairs in topological_order()."""
         visited: set[str] = set()
-        order: list[str] = []
+        order: list[tuple[str, DecompositionNode]] = []
 
         def visit(node_id: str) -> None:
             if node_id in visited:
@@ -572,7 +576,7 @@ class DecompositionTree(BaseModel):
             if node:
                 for child_id in node.children:
                     visit(child_id)
-                order.append(node_id)
+                order.append((node_id, node))
 
         # Start from root, then sweep any orphaned nodes
         visit(self.root_id)
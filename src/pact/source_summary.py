@@ -0,0 +1,108 @@
+"""Source summaries — public API surface of an implementation file.
+
+Integration prompts embed child implementations so the glue author can
+see the real APIs. Full source is fine for small children, but large
+ones blow the context budget while contributing mostly function bodies
+the glue never needs. These helpers reduce a file to its signatures:
+module-level functions, classes with their fields and methods, short
+constants, and the first line of each docstring.
+
+Python uses ``ast``; TypeScript/JavaScript use a regex over ``export``
+declarations. Private (underscore) names are dropped.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+
+# Module-level assignments longer than this are data, not API surface.
+_MAX_ASSIGN_CHARS = 200
+
+_PY_DEF_RE = re.compile(r"^(?:async\s+def|def|class)\s+[A-Za-z]\w*.*$", re.MULTILINE)
+
+_TS_EXPORT_RE = re.compile(
+    r"^export\s+(?:default\s+)?(?:declare\s+)?(?:async\s+)?(?:abstract\s+)?"
+    r"(?:function\*?|const|let|class|interface|type|enum)\b.*$",
+    re.MULTILINE,
+)
+
+
+def _is_private(name: str) -> bool:
+    return name.startswith("_") and not (name.startswith("__") and name.endswith("__"))
+
+
+def _stub_body(node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef) -> list[ast.stmt]:
+    """Docstring first line (if any) followed by ``...``."""
+    body: list[ast.stmt] = []
+    doc = ast.get_docstring(node)
+    if doc and doc.strip():
+        body.append(ast.Expr(ast.Constant(doc.strip().splitlines()[0])))
+    body.append(ast.Expr(ast.Constant(...)))
+    return body
+
+
+def _summarize_class(node: ast.ClassDef) -> None:
+    """Reduce a class body in place to docstring, fields, and method stubs."""
+    body = _stub_body(node)[:-1]
+    for item in node.body:
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not _is_private(item.name):
+                item.body = _stub_body(item)
+                body.append(item)
+        elif isinstance(item, (ast.AnnAssign, ast.Assign)):
+            body.append(item)
+    node.body = body or [ast.Expr(ast.Constant(...))]
+
+
+def summarize_python(source: str) -> str:
+    """Signatures, fields, and docstring first lines of a Python module.
+
+    Falls back to grepping ``def``/``class`` lines when the source does
+    not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return "\n".join(m.group(0).rstrip() for m in _PY_DEF_RE.finditer(source))
+
+    kept: list[str] = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if _is_private(node.name):
+                continue
+            node.body = _stub_body(node)
+        elif isinstance(node, ast.ClassDef):
+            if _is_private(node.name):
+                continue
+            _summarize_class(node)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            text = ast.unparse(node)
+            if len(text) <= _MAX_ASSIGN_CHARS:
+                kept.append(text)
+            continue
+        else:
+            continue
+        kept.append(ast.unparse(node))
+    return "\n\n".join(kept)
+
+
+def summarize_ts(source: str) -> str:
+    """Exported declarations of a TypeScript or JavaScript module.
+
+    Keeps the declaration line of each ``export`` (functions, consts,
+    classes, interfaces, types, enums), without the opening brace.
+    """
+    return "\n".join(
+        m.group(0).rstrip().rstrip("{").rstrip()
+        for m in _TS_EXPORT_RE.finditer(source)
+    )
+
+
+def summarize_source(filename: str, source: str) -> str:
+    """Summarize ``source`` by file extension. Unknown types pass through."""
+    if filename.endswith(".py"):
+        return summarize_python(source)
+    if filename.endswith((".ts", ".js")):
+        return summarize_ts(source)
+    return source
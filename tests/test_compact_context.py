@@ -8,7 +8,7 @@ from pact.schemas import (
     TypeSpec,
     TestCase,
 )
-from pact.interface_stub import render_compact_deps, render_handoff_brief
+from pact.interface_stub import render_compact_deps, render_compact_stub, render_handoff_brief
 
 
 def _make_contract(comp_id="comp_a", name="Component A"):
@@ -99,6 +99,35 @@ class TestRenderCompactDeps:
         full = render_stub(contract)
         assert len(compact) < len(full)
 
+    def test_compact_stub_matches_single_section(self):
+        contract = _make_contract()
+        assert render_compact_stub(contract) == render_compact_deps({"comp_a": contract})
+
+
+class TestHandoffBriefCompactStub:
+    def test_full_stub_default(self):
+        contract = _make_contract()
+        brief = render_handoff_brief("comp_a", contract, {"comp_a": contract})
+        assert "```python\n" in brief
+        assert "def process(" in brief
+
+    def test_compact_stub_mode(self):
+        contract = _make_contract()
+        brief = render_handoff_brief(
+            "comp_a", contract, {"comp_a": contract}, stub_mode="compact",
+        )
+        assert f"```\n{render_compact_stub(contract)}\n```" in brief
+        assert "def process(" not in brief
+
+    def test_compact_stub_keeps_preamble_fence(self):
+        contract = _make_contract()
+        preamble = "import logging\nlogger = logging.getLogger(__name__)"
+        brief = render_handoff_brief(
+            "comp_a", contract, {"comp_a": contract},
+            stub_mode="compact", log_key_preamble=preamble,
+        )
+        assert f"```python\n{preamble}\n```" in brief
+
 
 class TestHandoffBriefLazyTestCode:
     def test_with_test_code_default(self):
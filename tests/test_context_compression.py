@@ -107,6 +107,18 @@ class TestBuildCodeAgentContext:
         result = build_code_agent_context(contract, suite, research=research, max_tokens=500)
         assert "do_thing" in result
 
+    def test_custom_estimator_controls_budget(self):
+        contract = _make_contract()
+        suite = _make_test_suite()
+        decisions = ["short decision"] * 5
+        default = build_code_agent_context(contract, suite, decisions=decisions, max_tokens=600)
+        assert default.count("short decision") == 5
+        # A tokenizer that counts every character as a token exhausts the budget
+        costly = build_code_agent_context(
+            contract, suite, decisions=decisions, max_tokens=600, estimator=len,
+        )
+        assert "short decision" not in costly
+
     def test_no_decisions_no_section(self):
         contract = _make_contract()
         suite = _make_test_suite()
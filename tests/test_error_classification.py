@@ -1,6 +1,6 @@
 """Tests for error classification."""
 import asyncio
-from pact.lifecycle import ErrorClassification, classify_error
+from pact.lifecycle import ErrorClassification, _classify_error_type, classify_error
 
 
 class TestClassifyError:
@@ -39,6 +39,17 @@ class TestClassifyError:
         }
         assert classify_error(asyncio.TimeoutError(), context) == ErrorClassification.SYSTEMIC
 
+    def test_systemic_with_exception_instances(self):
+        context = {
+            "component_errors": {
+                "comp_a": ValueError("a"),
+                "comp_b": KeyError("b"),
+                "comp_c": ValueError("c"),
+                "comp_d": ValueError("d"),
+            }
+        }
+        assert classify_error(asyncio.TimeoutError(), context) == ErrorClassification.SYSTEMIC
+
     def test_not_systemic_with_mixed_errors(self):
         context = {
             "component_errors": {
@@ -63,6 +74,12 @@ class TestClassifyError:
         """OSError that's not FileNotFoundError/PermissionError -> transient."""
         assert classify_error(OSError("network")) == ErrorClassification.TRANSIENT
 
+    def test_repeat_error_class_is_cached(self):
+        _classify_error_type.cache_clear()
+        classify_error(ConnectionResetError("a"))
+        classify_error(ConnectionResetError("b"))
+        assert _classify_error_type.cache_info().hits == 1
+
     def test_httpx_timeout_by_class_name(self):
         """Simulated httpx timeout (by class name pattern)."""
         class ReadTimeout(Exception): pass
@@ -1,6 +1,6 @@
 """Tests for event sourcing and audit replay."""
 from pact.lifecycle import rebuild_state_from_audit, compute_audit_delta
-from pact.schemas import RunState
+from pact.schemas import ComponentTask, RunState
 
 
 class TestRebuildStateFromAudit:
@@ -70,6 +70,18 @@ class TestRebuildStateFromAudit:
         assert len(completed) == 2
         assert len(failed) == 1
 
+    def test_repeated_builds_update_same_task(self):
+        entries = [
+            {"timestamp": "2024-01-01T00:00:00", "action": "build", "detail": "comp_a: 1/5 passed"},
+            {"timestamp": "2024-01-01T00:01:00", "action": "build", "detail": "comp_b: 3/3 passed"},
+            {"timestamp": "2024-01-01T00:02:00", "action": "build", "detail": "comp_a: 5/5 passed"},
+        ]
+        state = rebuild_state_from_audit(entries, "/tmp/test")
+        assert [t.component_id for t in state.component_tasks] == ["comp_a", "comp_b"]
+        task = state.component_tasks[0]
+        assert task.attempts == 2
+        assert task.status == "completed"
+
 
 class TestComputeAuditDelta:
     def test_consistent_state_no_delta(self):
@@ -95,3 +107,15 @@ class TestComputeAuditDelta:
         delta = compute_audit_delta(state, entries)
         assert len(delta) > 0
         assert any("status" in d.lower() for d in delta)
+
+    def test_component_count_mismatch_reported(self):
+        state = RunState(
+            id="x", project_dir="/tmp", phase="implement",
+            component_tasks=[ComponentTask(component_id="comp_a", status="completed")],
+        )
+        entries = [
+            {"timestamp": "2024-01-01T00:00:00", "action": "build", "detail": "comp_a: 0/4 passed"},
+        ]
+        delta = compute_audit_delta(state, entries)
+        assert any("Completed component count mismatch" in d for d in delta)
+        assert any("Failed component count mismatch" in d for d in delta)
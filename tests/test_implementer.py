@@ -192,6 +192,24 @@ class TestGetRequiredExports:
         exports = get_required_exports(contract)
         assert exports.count("MyError") == 1
 
+    def test_error_type_matching_type_name_listed_once(self):
+        contract = _make_contract(
+            types=[TypeSpec(name="MyError", kind="struct")],
+            functions=[
+                FunctionContract(
+                    name="load", description="", inputs=[], output_type="None",
+                    error_cases=[ErrorCase(name="e", condition="c", error_type="MyError")],
+                ),
+                FunctionContract(
+                    name="load", description="", inputs=[], output_type="None",
+                ),
+            ],
+        )
+        assert get_required_exports(contract) == ["MyError", "load"]
+
+    def test_empty_contract(self):
+        assert get_required_exports(_make_contract()) == []
+
     def test_filters_dotted_method_names(self):
         contract = _make_contract(functions=[
             FunctionContract(
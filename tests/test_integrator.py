@@ -4,14 +4,33 @@ from __future__ import annotations
 
 import asyncio
 import inspect
+import json
+import os
+from collections import OrderedDict
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
+
 from pact.integrator import (
+    _child_contracts_json,
+    _classify_failure,
+    _format_failure_context,
+    _record_failures,
+    _render_child_impls,
+    _run_limited,
+    _walk_sources,
+    _warmup_runner,
+    _write_file,
+    _write_if_changed,
+    _write_results_if_changed,
+    integrate_all,
     integrate_all_iterative,
     integrate_component,
     integrate_component_iterative,
 )
+from pact.budget import BudgetExceeded
+from pact.project import ProjectManager
 from pact.schemas import (
     ComponentContract,
     ContractTestSuite,
@@ -19,6 +38,7 @@ from pact.schemas import (
     DecompositionTree,
     FieldSpec,
     FunctionContract,
+    TestFailure,
     TestResults,
 )
 
@@ -150,6 +170,7 @@ class TestIntegrateComponentIterative:
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -194,6 +215,7 @@ class TestIntegrateComponentIterative:
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -231,6 +253,7 @@ class TestIntegrateComponentIterative:
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -266,6 +289,7 @@ class TestIntegrateComponentIterative:
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -392,6 +416,7 @@ class TestIntegrateComponentPrompt:
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -426,6 +451,9 @@ class TestIntegrateComponentPrompt:
         assert "do_a" in prompt_text
         # Should contain the component_id from the JSON
         assert '"component_id"' in prompt_text or "component_id" in prompt_text
+        # Section headers start at column 0
+        assert "\nParent: Root (id: root)\n" in prompt_text
+        assert "\nGenerate:\n" in prompt_text
 
     def test_prompt_includes_child_implementations(self, tmp_path):
         """If child implementations exist on disk, they should appear in the prompt."""
@@ -443,6 +471,7 @@ class TestIntegrateComponentPrompt:
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -492,6 +521,7 @@ class TestIntegrateComponentIterativeRelativePaths:
         project.test_code_path.return_value = tmp_path / "tests" / "test.py"
         project.composition_dir.return_value = tmp_path / "comp" / "root"
         project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
         (tmp_path / "comp" / "root").mkdir(parents=True)
         (tmp_path / "tests").mkdir(parents=True)
 
@@ -531,3 +561,605 @@ class TestIntegrateComponentIterativeRelativePaths:
                 assert "PYTHONPATH=" in line or "NODE_PATH=" in line, (
                     f"Absolute path leaked into prompt: {line.strip()[:100]}"
                 )
+
+
+class TestIntegrateComponentCache:
+    """Unchanged subtrees reuse the last passing glue without an LLM call."""
+
+    def _run(self, tmp_path, agent):
+        parent = _make_contract("root", "Root")
+        child_a = _make_contract("a", "ChildA")
+        test_suite = _make_test_suite("root", "def test_root(): pass")
+
+        project = MagicMock()
+        project.language = "python"
+        project.project_dir = tmp_path
+        project.integration_cache_dir = tmp_path / "integration"
+        project.composition_dir.return_value = tmp_path / "comp" / "root"
+        project.test_code_path.return_value = tmp_path / "tests" / "test.py"
+        project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path / "internal"
+        (tmp_path / "comp" / "root").mkdir(parents=True, exist_ok=True)
+        (tmp_path / "tests").mkdir(parents=True, exist_ok=True)
+        (tmp_path / "internal").mkdir(parents=True, exist_ok=True)
+
+        with patch("pact.integrator.run_contract_tests", new_callable=AsyncMock) as mock_tests:
+            mock_tests.return_value = TestResults(total=1, passed=1, failed=0, errors=0)
+            return asyncio.run(integrate_component(
+                agent=agent,
+                project=project,
+                parent_id="root",
+                parent_contract=parent,
+                parent_test_suite=test_suite,
+                child_contracts={"a": child_a},
+            ))
+
+    def _agent(self):
+        async def mock_assess(model, prompt, system):
+            return model(glue_code="# glue", composition_test=""), 0, 0
+
+        agent = MagicMock()
+        agent.assess = AsyncMock(side_effect=mock_assess)
+        return agent
+
+    def test_second_run_skips_llm(self, tmp_path):
+        first = self._agent()
+        self._run(tmp_path, first)
+        assert first.assess.await_count == 1
+
+        (tmp_path / "comp" / "root" / "glue.py").unlink()
+        second = self._agent()
+        results = self._run(tmp_path, second)
+        assert second.assess.await_count == 0
+        assert results.all_passed
+        assert (tmp_path / "comp" / "root" / "glue.py").read_text() == "# glue"
+
+    def test_hit_persists_cached_results(self, tmp_path):
+        self._run(tmp_path, self._agent())
+        results_path = tmp_path / "internal" / "test_results.json"
+        results_path.unlink()
+
+        results = self._run(tmp_path, self._agent())
+        saved = TestResults.model_validate_json(results_path.read_text())
+        assert saved == results
+
+    def test_child_change_invalidates(self, tmp_path):
+        self._run(tmp_path, self._agent())
+
+        impl_src = tmp_path / "impl" / "a" / "src"
+        impl_src.mkdir(parents=True)
+        (impl_src / "a.py").write_text("def run():\n    return 'x'\n")
+        second = self._agent()
+        self._run(tmp_path, second)
+        assert second.assess.await_count == 1
+
+
+def _failing(*test_ids, message="FAILED"):
+    return TestResults(
+        total=len(test_ids), passed=0, failed=len(test_ids), errors=0,
+        failure_details=[
+            TestFailure(test_id=tid, error_message=message) for tid in test_ids
+        ],
+    )
+
+
+class TestPriorFailureLog:
+    """Prior failures are deduplicated and rendered as a compact block."""
+
+    def test_repeated_failure_counted_once(self):
+        log = OrderedDict()
+        _record_failures(log, _failing("t1"))
+        _record_failures(log, _failing("t1"))
+        assert len(log) == 1
+        assert next(iter(log.values()))["seen"] == 2
+
+    def test_error_message_truncated(self):
+        log = OrderedDict()
+        _record_failures(log, _failing("t1", message="x" * 1000))
+        assert len(next(iter(log.values()))["error"]) == 300
+
+    def test_log_is_capped(self):
+        log = OrderedDict()
+        _record_failures(log, _failing(*[f"t{i}" for i in range(50)]))
+        assert len(log) == 20
+        assert "t49" in {e["test"] for e in log.values()}
+
+    def test_context_lists_repeated_as_stop_doing(self):
+        log = OrderedDict()
+        _record_failures(log, _failing("t1", "t2"))
+        _record_failures(log, _failing("t1"))
+        context = _format_failure_context(log)
+        block = json.loads(context.split("Prior failures:\n", 1)[1])
+        assert block["stop_doing"]
+        assert len(block["try_doing"]) == 1
+        assert "t1" in block["try_doing"][0]
+
+    def test_empty_log_renders_nothing(self):
+        assert _format_failure_context(OrderedDict()) == ""
+
+    def test_identical_failures_stop_early(self, tmp_path):
+        parent = _make_contract("root", "Root")
+        test_suite = _make_test_suite("root", "def test_root(): pass")
+
+        project = MagicMock()
+        project.language = "python"
+        project.composition_dir.return_value = tmp_path / "comp" / "root"
+        project.test_code_path.return_value = tmp_path / "tests" / "test.py"
+        project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
+        (tmp_path / "comp" / "root").mkdir(parents=True)
+        (tmp_path / "tests").mkdir(parents=True)
+
+        async def mock_assess(model, prompt, system):
+            return model(glue_code="# glue"), 0, 0
+
+        agent = MagicMock()
+        agent.assess = AsyncMock(side_effect=mock_assess)
+
+        with patch("pact.integrator.run_contract_tests", new_callable=AsyncMock) as mock_tests:
+            mock_tests.return_value = _failing("t1")
+            asyncio.run(integrate_component(
+                agent=agent,
+                project=project,
+                parent_id="root",
+                parent_contract=parent,
+                parent_test_suite=test_suite,
+                child_contracts={},
+                max_attempts=5,
+            ))
+
+        assert agent.assess.await_count == 2
+
+
+class TestChildContractsJson:
+    def test_single_json_object_keyed_by_child(self):
+        rendered = _child_contracts_json({
+            "a": _make_contract("a", "ChildA"),
+            "b": _make_contract("b", "ChildB"),
+        })
+        data = json.loads(rendered)
+        assert list(data) == ["a", "b"]
+        assert data["a"]["name"] == "ChildA"
+        assert data["b"]["functions"][0]["name"] == "run"
+
+    def test_empty(self):
+        assert json.loads(_child_contracts_json({})) == {}
+
+
+class TestWriteFile:
+    def test_creates_file(self, tmp_path):
+        path = tmp_path / "glue.py"
+        _write_file(path, "x = 1\n")
+        assert path.read_text() == "x = 1\n"
+
+    def test_truncates_existing(self, tmp_path):
+        path = tmp_path / "glue.py"
+        path.write_text("a much longer previous version\n")
+        _write_file(path, "short")
+        assert path.read_text() == "short"
+
+    def test_non_ascii(self, tmp_path):
+        path = tmp_path / "glue.py"
+        _write_file(path, "# — ü\n")
+        assert path.read_text() == "# — ü\n"
+
+
+class TestRenderChildImpls:
+    def test_full_source_within_budget(self):
+        sources = [("a", "a.py", "def run():\n    return 'hello'\n")]
+        out = _render_child_impls(sources)
+        assert "=== a implementation (a.py) ===" in out
+        assert "return 'hello'" in out
+
+    def test_summarized_over_budget(self):
+        body = "\n".join(f"    x{i} = {i}" for i in range(400))
+        sources = [("a", "a.py", f"def run(n: int) -> int:\n{body}\n    return n\n")]
+        out = _render_child_impls(sources, token_budget=200)
+        assert "def run(n: int) -> int:" in out
+        assert "x399" not in out
+        assert "signatures only" in out
+
+    def test_drops_files_beyond_budget(self):
+        sources = [
+            (cid, f"{cid}.py", "".join(f"def f{i}(a, b, c): pass\n" for i in range(30)))
+            for cid in ("a", "b", "c")
+        ]
+        out = _render_child_impls(sources, token_budget=250)
+        assert "=== a implementation" in out
+        assert "=== c implementation" not in out
+        assert "omitted" in out
+
+
+class TestWarmupRunner:
+    @pytest.mark.parametrize("language, cmd", [
+        ("python", ("python3", "-c", "import pytest")),
+        ("typescript", ("npx", "vitest", "--version")),
+        ("javascript", ("npx", "vitest", "--version")),
+    ])
+    def test_warms_language_runner(self, tmp_path, language, cmd):
+        with patch("pact.integrator.asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
+            mock_exec.return_value.wait = AsyncMock(return_value=0)
+            asyncio.run(_warmup_runner(language, tmp_path))
+        assert mock_exec.call_args[0][:3] == cmd
+
+    def test_missing_runner_ignored(self, tmp_path):
+        with patch(
+            "pact.integrator.asyncio.create_subprocess_exec",
+            new_callable=AsyncMock, side_effect=FileNotFoundError("npx"),
+        ):
+            asyncio.run(_warmup_runner("typescript", tmp_path))
+
+    @pytest.mark.parametrize("language", ["rust", "go"])
+    def test_other_languages_skipped(self, tmp_path, language):
+        with patch("pact.integrator.asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
+            asyncio.run(_warmup_runner(language, tmp_path))
+        mock_exec.assert_not_called()
+
+
+class TestRunLimited:
+    def test_respects_semaphore(self):
+        active = []
+        peak = []
+
+        async def integrate_one(cid):
+            active.append(cid)
+            peak.append(len(active))
+            await asyncio.sleep(0)
+            active.remove(cid)
+            return cid, TestResults(total=1, passed=1)
+
+        async def run():
+            sem = asyncio.Semaphore(1)
+            results = await asyncio.gather(
+                *[_run_limited(sem, integrate_one, cid) for cid in ("a", "b", "c")]
+            )
+            return [r[0] for r in results]
+
+        assert asyncio.run(run()) == ["a", "b", "c"]
+        assert max(peak) == 1
+
+
+def _two_parent_tree():
+    """root -> (p1, p2), each parent with one leaf: p1 and p2 share a group."""
+    nodes = {
+        "root": DecompositionNode(
+            component_id="root", name="Root", description="r", children=["p1", "p2"],
+        ),
+    }
+    for parent, leaf in (("p1", "l1"), ("p2", "l2")):
+        nodes[parent] = DecompositionNode(
+            component_id=parent, name=parent, description=parent,
+            parent_id="root", children=[leaf],
+        )
+        nodes[leaf] = DecompositionNode(
+            component_id=leaf, name=leaf, description=leaf, parent_id=parent,
+        )
+    tree = DecompositionTree(root_id="root", nodes=nodes)
+    project = MagicMock()
+    project.load_all_contracts.return_value = {
+        cid: _make_contract(cid, cid) for cid in nodes
+    }
+    project.load_all_test_suites.return_value = {
+        cid: _make_test_suite(cid) for cid in ("root", "p1", "p2")
+    }
+    return tree, project
+
+
+def _budget_exceeded_for_p2(parent_arg: int):
+    """Integration stand-in that hits the budget cap for parent p2 only."""
+
+    async def integrate(*args, **kwargs):
+        if args[parent_arg] == "p2":
+            raise BudgetExceeded("cap reached")
+        await asyncio.sleep(0)
+        return TestResults(total=1, passed=1)
+
+    return integrate
+
+
+class TestParallelBudgetExceeded:
+    """BudgetExceeded from a parallel group reaches the caller unwrapped,
+    so the scheduler records budget_exceeded rather than a failed run."""
+
+    def test_integrate_all(self):
+        tree, project = _two_parent_tree()
+        assert any(
+            "p2" in group and len(group) > 1 for group in tree.non_leaf_parallel_groups()
+        )
+        with patch(
+            "pact.integrator.integrate_component",
+            side_effect=_budget_exceeded_for_p2(2),
+        ):
+            with pytest.raises(BudgetExceeded):
+                asyncio.run(integrate_all(MagicMock(), project, tree, parallel=True))
+
+    def test_integrate_all_iterative(self):
+        tree, project = _two_parent_tree()
+        with patch(
+            "pact.integrator.integrate_component_iterative",
+            side_effect=_budget_exceeded_for_p2(1),
+        ):
+            with pytest.raises(BudgetExceeded):
+                asyncio.run(integrate_all_iterative(
+                    project=project, tree=tree, budget=MagicMock(), parallel=True,
+                ))
+
+
+class TestNoJitDependencies:
+    """integrator.py is I/O-bound; JIT compilers only add import cost."""
+
+    def test_no_jit_imports(self):
+        import ast
+        import pact.integrator
+
+        tree = ast.parse(Path(pact.integrator.__file__).read_text())
+        imported = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                imported.add(node.module.split(".")[0])
+        assert not imported & {"numba", "llvmlite", "cython", "Cython"}
+
+
+class TestClassifyFailure:
+    def test_timeout(self):
+        results = TestResults(errors=1, failure_details=[
+            TestFailure(test_id="timeout", error_message="Tests timed out after 120s"),
+        ])
+        assert _classify_failure(results) == "timeout"
+
+    def test_execution_error_is_infra(self):
+        results = TestResults(errors=1, failure_details=[
+            TestFailure(test_id="execution", error_message="[Errno 2] No such file"),
+        ])
+        assert _classify_failure(results) == "infra"
+
+    def test_missing_runner_is_infra(self):
+        results = TestResults(errors=1, failure_details=[
+            TestFailure(
+                test_id="collection", error_message="Failed to collect tests",
+                stderr="/usr/bin/python3: No module named pytest",
+            ),
+        ])
+        assert _classify_failure(results) == "infra"
+
+    def test_assertion_failure_is_logic(self):
+        assert _classify_failure(_failing("t1")) == "logic"
+
+    def test_glue_import_error_is_logic(self):
+        results = TestResults(errors=1, failure_details=[
+            TestFailure(
+                test_id="collection", error_message="Failed to collect tests",
+                stderr="ModuleNotFoundError: No module named 'child_a'",
+            ),
+        ])
+        assert _classify_failure(results) == "logic"
+
+    def test_mixed_is_logic(self):
+        results = TestResults(failed=1, errors=1, failure_details=[
+            TestFailure(test_id="timeout", error_message="timed out"),
+            TestFailure(test_id="t1", error_message="FAILED"),
+        ])
+        assert _classify_failure(results) == "logic"
+
+
+class TestInfraRerun:
+    """Runner-side failures re-run tests without a new LLM call."""
+
+    def _run(self, tmp_path, test_results_seq):
+        parent = _make_contract("root", "Root")
+        test_suite = _make_test_suite("root", "def test_root(): pass")
+
+        project = MagicMock()
+        project.language = "python"
+        project.composition_dir.return_value = tmp_path / "comp" / "root"
+        project.test_code_path.return_value = tmp_path / "tests" / "test.py"
+        project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
+        (tmp_path / "comp" / "root").mkdir(parents=True)
+        (tmp_path / "tests").mkdir(parents=True)
+
+        async def mock_assess(model, prompt, system):
+            return model(glue_code="# glue"), 0, 0
+
+        agent = MagicMock()
+        agent.assess = AsyncMock(side_effect=mock_assess)
+
+        with patch("pact.integrator.run_contract_tests", new_callable=AsyncMock) as mock_tests, \
+                patch("pact.integrator._RERUN_DELAY", 0):
+            mock_tests.side_effect = test_results_seq
+            results = asyncio.run(integrate_component(
+                agent=agent,
+                project=project,
+                parent_id="root",
+                parent_contract=parent,
+                parent_test_suite=test_suite,
+                child_contracts={},
+                max_attempts=3,
+            ))
+        return agent, mock_tests, results
+
+    def test_timeout_then_pass_reuses_glue(self, tmp_path):
+        timeout = TestResults(errors=1, failure_details=[
+            TestFailure(test_id="timeout", error_message="timed out"),
+        ])
+        passing = TestResults(total=1, passed=1)
+        agent, mock_tests, results = self._run(tmp_path, [timeout, passing])
+        assert results.all_passed
+        assert agent.assess.await_count == 1
+        assert mock_tests.await_count == 2
+
+    def test_repeated_infra_regenerates(self, tmp_path):
+        timeout = TestResults(errors=1, failure_details=[
+            TestFailure(test_id="timeout", error_message="timed out"),
+        ])
+        passing = TestResults(total=1, passed=1)
+        agent, mock_tests, results = self._run(
+            tmp_path, [timeout, timeout, passing],
+        )
+        assert results.all_passed
+        assert agent.assess.await_count == 2
+        assert mock_tests.await_count == 3
+
+
+class TestIntegrationAuditFlush:
+    def test_earlier_attempts_on_disk_when_later_attempt_raises(self, tmp_path):
+        parent = _make_contract("root", "Root")
+        test_suite = _make_test_suite("root", "def test_root(): pass")
+        pm = ProjectManager(tmp_path / "proj")
+
+        project = MagicMock()
+        project.language = "python"
+        project.composition_dir.return_value = tmp_path / "comp" / "root"
+        project.test_code_path.return_value = tmp_path / "tests" / "test.py"
+        project.impl_src_dir.side_effect = lambda cid: tmp_path / "impl" / cid / "src"
+        project._internal_composition_dir.return_value = tmp_path
+        project.audit_batch = pm.audit_batch
+        (tmp_path / "comp" / "root").mkdir(parents=True)
+        (tmp_path / "tests").mkdir(parents=True)
+
+        on_disk_during_attempt_2 = []
+
+        async def mock_assess(model, prompt, system):
+            if agent.assess.await_count == 2:
+                on_disk_during_attempt_2.extend(e["detail"] for e in pm.load_audit())
+                raise RuntimeError("LLM unavailable")
+            return model(glue_code="# glue"), 0, 0
+
+        agent = MagicMock()
+        agent.assess = AsyncMock(side_effect=mock_assess)
+        failing = TestResults(total=1, failed=1, failure_details=[
+            TestFailure(test_id="test_root", error_message="AssertionError: wrong"),
+        ])
+
+        with patch("pact.integrator.run_contract_tests", new_callable=AsyncMock) as mock_tests:
+            mock_tests.return_value = failing
+            with pytest.raises(RuntimeError, match="LLM unavailable"):
+                asyncio.run(integrate_component(
+                    agent=agent,
+                    project=project,
+                    parent_id="root",
+                    parent_contract=parent,
+                    parent_test_suite=test_suite,
+                    child_contracts={},
+                    max_attempts=3,
+                ))
+
+        assert on_disk_during_attempt_2 == ["root attempt 1"]
+        assert [e["detail"] for e in pm.load_audit()] == ["root attempt 1"]
+
+
+class TestWalkSources:
+    def test_finds_sources_recursively(self, tmp_path):
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "a.py").write_text("")
+        (tmp_path / "pkg" / "b.ts").write_text("")
+        (tmp_path / "pkg" / "c.js").write_text("")
+        (tmp_path / "notes.md").write_text("")
+        found = [Path(p).relative_to(tmp_path).as_posix() for p in _walk_sources(str(tmp_path))]
+        assert found == ["a.py", "pkg/b.ts", "pkg/c.js"]
+
+    def test_skips_node_modules_and_pycache(self, tmp_path):
+        (tmp_path / "node_modules" / "dep").mkdir(parents=True)
+        (tmp_path / "node_modules" / "dep" / "index.js").write_text("")
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "x.py").write_text("")
+        assert list(_walk_sources(str(tmp_path))) == []
+
+    def test_missing_root(self, tmp_path):
+        assert list(_walk_sources(str(tmp_path / "nope"))) == []
+
+    def test_custom_exts(self, tmp_path):
+        (tmp_path / "a.py").write_text("")
+        (tmp_path / "b.rs").write_text("")
+        assert [Path(p).name for p in _walk_sources(str(tmp_path), (".rs",))] == ["b.rs"]
+
+
+class TestWriteIfChanged:
+    def test_writes_new_file(self, tmp_path):
+        path = tmp_path / "out.json"
+        assert _write_if_changed(path, "{}") is True
+        assert path.read_text() == "{}"
+
+    def test_skips_identical(self, tmp_path):
+        path = tmp_path / "out.json"
+        path.write_text("same")
+        os.utime(path, (0, 0))
+        assert _write_if_changed(path, "same") is False
+        assert path.stat().st_mtime == 0
+
+    def test_rewrites_same_size_different_content(self, tmp_path):
+        path = tmp_path / "out.json"
+        path.write_text("aaaa")
+        assert _write_if_changed(path, "bbbb") is True
+        assert path.read_text() == "bbbb"
+
+    def test_rewrites_different_size(self, tmp_path):
+        path = tmp_path / "out.json"
+        path.write_text("a")
+        assert _write_if_changed(path, "abc") is True
+        assert path.read_text() == "abc"
+
+
+class TestWriteResultsIfChanged:
+    def test_skips_same_results_with_new_timestamp(self, tmp_path):
+        path = tmp_path / "test_results.json"
+        first = TestResults(total=3, passed=2, failed=1, timestamp="2024-01-01T00:00:00")
+        assert _write_results_if_changed(path, first) is True
+        os.utime(path, (0, 0))
+
+        again = TestResults(total=3, passed=2, failed=1, timestamp="2024-01-02T00:00:00")
+        assert _write_results_if_changed(path, again) is False
+        assert path.stat().st_mtime == 0
+        assert json.loads(path.read_text())["timestamp"] == "2024-01-01T00:00:00"
+
+    def test_rewrites_changed_results(self, tmp_path):
+        path = tmp_path / "test_results.json"
+        _write_results_if_changed(path, TestResults(total=3, passed=2, failed=1))
+        assert _write_results_if_changed(path, TestResults(total=3, passed=3)) is True
+        assert json.loads(path.read_text())["passed"] == 3
+
+    def test_rewrites_unreadable_file(self, tmp_path):
+        path = tmp_path / "test_results.json"
+        path.write_text("not json")
+        assert _write_results_if_changed(path, TestResults(total=1, passed=1)) is True
+        assert json.loads(path.read_text())["total"] == 1
+
+    def test_repeat_iterative_run_does_not_rewrite_results(self, tmp_path):
+        parent = _make_contract("root", "Root")
+        test_suite = _make_test_suite("root")
+
+        project = MagicMock()
+        project.project_dir = tmp_path
+        project.test_code_path.return_value = tmp_path / "tests" / "test.py"
+        project.composition_dir.return_value = tmp_path / "comp" / "root"
+        project._internal_composition_dir.return_value = tmp_path
+        (tmp_path / "comp" / "root").mkdir(parents=True)
+        (tmp_path / "tests").mkdir(parents=True)
+        results_path = tmp_path / "test_results.json"
+
+        budget = MagicMock()
+        budget.record_tokens_validated = MagicMock(return_value=True)
+
+        def run(timestamp: str) -> None:
+            with patch("pact.backends.claude_code.ClaudeCodeBackend") as MockBackend:
+                MockBackend.return_value.implement = AsyncMock(return_value=("done", 0, 0))
+                with patch("pact.integrator.run_contract_tests", new_callable=AsyncMock) as mock_tests:
+                    mock_tests.return_value = TestResults(
+                        total=4, passed=4, timestamp=timestamp,
+                    )
+                    asyncio.run(integrate_component_iterative(
+                        project=project,
+                        parent_id="root",
+                        parent_contract=parent,
+                        parent_test_suite=test_suite,
+                        child_contracts={},
+                        budget=budget,
+                    ))
+
+        run("2024-01-01T00:00:00")
+        os.utime(results_path, (0, 0))
+        run("2024-01-01T00:05:00")
+        assert results_path.stat().st_mtime == 0
+
@@ -0,0 +1,84 @@
+"""Tests for integration cache persistence."""
+from pathlib import Path
+
+from pact.integrator_cache import (
+    compute_key,
+    load_integration,
+    save_integration,
+)
+from pact.schemas import ComponentContract, FunctionContract, TestResults
+
+
+def _contract(cid: str, name: str) -> ComponentContract:
+    return ComponentContract(
+        component_id=cid,
+        name=name,
+        description=f"{name} description",
+        functions=[FunctionContract(
+            name="run", description="d", inputs=[], output_type="str",
+        )],
+    )
+
+
+def _passing() -> TestResults:
+    return TestResults(total=3, passed=3, failed=0, errors=0)
+
+
+class TestComputeKey:
+    def test_deterministic(self):
+        parent = _contract("root", "Root")
+        children = {"a": _contract("a", "A")}
+        k1 = compute_key(parent, children, "src", "tests")
+        k2 = compute_key(parent, children, "src", "tests")
+        assert k1 == k2
+
+    def test_prefixed_with_parent_id(self):
+        key = compute_key(_contract("root", "Root"), {}, "", "")
+        assert key.startswith("root__")
+        assert len(key.split("__")[1]) == 16
+
+    def test_child_order_irrelevant(self):
+        parent = _contract("root", "Root")
+        a, b = _contract("a", "A"), _contract("b", "B")
+        assert (
+            compute_key(parent, {"a": a, "b": b}, "", "")
+            == compute_key(parent, {"b": b, "a": a}, "", "")
+        )
+
+    def test_child_impl_change_changes_key(self):
+        parent = _contract("root", "Root")
+        k1 = compute_key(parent, {}, "def a(): pass", "")
+        k2 = compute_key(parent, {}, "def a(): return 1", "")
+        assert k1 != k2
+
+    def test_child_contract_change_changes_key(self):
+        parent = _contract("root", "Root")
+        k1 = compute_key(parent, {"a": _contract("a", "A")}, "", "")
+        k2 = compute_key(parent, {"a": _contract("a", "A2")}, "", "")
+        assert k1 != k2
+
+    def test_test_code_change_changes_key(self):
+        parent = _contract("root", "Root")
+        assert compute_key(parent, {}, "", "x") != compute_key(parent, {}, "", "y")
+
+
+class TestSaveLoad:
+    def test_roundtrip(self, tmp_path: Path):
+        save_integration(tmp_path, "root__abc", "glue", "comp", _passing())
+        entry = load_integration(tmp_path, "root__abc")
+        assert entry is not None
+        assert entry.glue_code == "glue"
+        assert entry.composition_test == "comp"
+        assert entry.test_results.all_passed
+
+    def test_missing_returns_none(self, tmp_path: Path):
+        assert load_integration(tmp_path, "nope") is None
+
+    def test_failing_results_not_cached(self, tmp_path: Path):
+        failing = TestResults(total=2, passed=1, failed=1, errors=0)
+        save_integration(tmp_path, "root__abc", "glue", "", failing)
+        assert load_integration(tmp_path, "root__abc") is None
+
+    def test_corrupt_entry_returns_none(self, tmp_path: Path):
+        (tmp_path / "root__abc.json").write_text("not json")
+        assert load_integration(tmp_path, "root__abc") is None
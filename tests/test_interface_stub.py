@@ -4,11 +4,16 @@ from __future__ import annotations
 
 from pact.interface_stub import (
     _map_type_js,
+    _map_type_ts,
+    _split_type_args,
+    build_code_agent_context,
+    get_required_exports,
     render_dependency_map,
     render_handoff_brief,
     render_progress_snapshot,
     render_stub,
     render_stub_js,
+    render_stub_rust,
     render_stub_ts,
 )
 from pact.schemas import (
@@ -216,6 +221,10 @@ class TestRenderStub:
         stub = render_stub(contract)
         assert "Simple" in stub
         assert "def do_thing()" in stub
+        assert (
+            '    Does the thing\n\n    Side effects: none\n    Idempotent: no\n    """\n    ...'
+            in stub
+        )
 
     def test_list_type(self):
         contract = ComponentContract(
@@ -305,6 +314,29 @@ class TestRenderDependencyMap:
         # Should show struct fields compactly
         assert "available" in dep_map
 
+    def test_exact_output(self):
+        contracts = {
+            "pricing": _make_pricing_contract(),
+            "inventory": _make_inventory_contract(),
+        }
+        assert render_dependency_map("pricing", contracts) == (
+            "# Available dependencies for: pricing\n"
+            "\n"
+            "## Inventory Service (inventory) v1\n"
+            "  type AvailabilityResult { available: bool, unit_id: str }\n"
+            "  check_availability(unit_id: str, check_in: str, check_out: str) -> AvailabilityResult\n"
+            "    errors: UNIT_NOT_FOUND\n"
+        )
+
+    def test_reflects_in_place_dependency_edits(self):
+        inventory = _make_inventory_contract()
+        contracts = {"pricing": _make_pricing_contract(), "inventory": inventory}
+        render_dependency_map("pricing", contracts)
+        inventory.functions[0].name = "reserve_unit"
+        after = render_dependency_map("pricing", contracts)
+        assert "reserve_unit(" in after
+        assert "check_availability" not in after
+
 
 class TestRenderHandoffBrief:
     def test_contains_interface_stub(self):
@@ -385,6 +417,32 @@ class TestRenderHandoffBrief:
 
 
 class TestRenderProgressSnapshot:
+    def test_exact_output(self):
+        state = RunState(
+            id="abc", project_dir="/tmp", status="active", phase="implement",
+            pause_reason="budget",
+        )
+        assert render_progress_snapshot(state) == (
+            "# PROGRESS SNAPSHOT\n"
+            "Run: abc | Phase: implement | Status: active\n"
+            "Cost: $0.0000 | Tokens: 0\n"
+            "\n"
+            "PAUSED: budget\n"
+        )
+
+    def test_component_task_lines(self):
+        state = RunState(
+            id="abc", project_dir="/tmp",
+            component_tasks=[
+                ComponentTask(component_id="a", status="implementing"),
+                ComponentTask(component_id="b", status="failed", last_error="boom"),
+                ComponentTask(component_id="c", status="completed"),
+                ComponentTask(component_id="d", status="implementing"),
+            ],
+        )
+        snapshot = render_progress_snapshot(state)
+        assert snapshot.endswith("Active: a, d\nFailed: b (boom)\n")
+
     def test_basic_state(self):
         state = RunState(
             id="abc123", project_dir="/tmp/test",
@@ -529,3 +587,108 @@ class TestMapTypeJs:
         result = _map_type_js("Optional[str]")
         assert "string" in result
         assert "undefined" in result
+
+
+class TestMapTypeTs:
+    """Tests for TypeScript type mapping."""
+
+    def test_primitive(self):
+        assert _map_type_ts("str") == "string"
+
+    def test_optional(self):
+        assert _map_type_ts("Optional[int]") == "number | undefined"
+
+    def test_list_of_union_parenthesized(self):
+        assert _map_type_ts("list[str | int]") == "(string | number)[]"
+
+    def test_nested_dict(self):
+        assert _map_type_ts("dict[str, list[dict[str, int]]]") == (
+            "Record<string, Record<string, number>[]>"
+        )
+
+    def test_dict_without_value_type(self):
+        assert _map_type_ts("dict[str]") == "Record<string, unknown>"
+
+    def test_generic_prefix_must_match_whole_ref(self):
+        assert _map_type_ts("MyOptional[str]") == "MyOptional[str]"
+
+    def test_equal_refs_share_cache_entry(self):
+        _map_type_ts.cache_clear()
+        first = "".join(["list[", "Price]"])
+        second = "".join(["list[Pr", "ice]"])
+        assert first is not second
+        _map_type_ts(first)
+        hits = _map_type_ts.cache_info().hits
+        _map_type_ts(second)
+        assert _map_type_ts.cache_info().hits == hits + 1
+
+
+class TestSplitTypeArgs:
+    def test_simple(self):
+        assert _split_type_args("str, int") == ("str", "int")
+
+    def test_skips_nested_commas(self):
+        assert _split_type_args("dict[a, b], list[c]") == ("dict[a, b]", "list[c]")
+
+    def test_no_comma(self):
+        assert _split_type_args("str") is None
+
+    def test_nested_value_only(self):
+        assert _split_type_args("str, list[int]") == ("str", "list[int]")
+
+
+class TestSharedExports:
+    """Callers rendering several formats pass the exports list in once."""
+
+    def test_passed_exports_skip_recompute(self, monkeypatch):
+        import pact.interface_stub as stub_mod
+
+        contract = _make_pricing_contract()
+        exports = get_required_exports(contract)
+        renderers = (render_stub, render_stub_ts, render_stub_js, render_stub_rust)
+        expected = [render(contract) for render in renderers]
+        calls = []
+        monkeypatch.setattr(
+            stub_mod, "get_required_exports", lambda c: calls.append(c) or [],
+        )
+        assert [render(contract, exports) for render in renderers] == expected
+        assert calls == []
+
+
+class TestSharedStub:
+    """A stub rendered once is reused by the handoff brief and agent context."""
+
+    def test_prerendered_stub_renders_once(self, monkeypatch):
+        import pact.interface_stub as stub_mod
+
+        calls = []
+
+        def counting_render(contract):
+            calls.append(contract)
+            return render_stub(contract)
+
+        monkeypatch.setattr(stub_mod, "_DEFAULT_STUB_RENDERER", (counting_render, "python"))
+        contract = _make_pricing_contract()
+        suite = ContractTestSuite(component_id="pricing", contract_version=1)
+        stub = counting_render(contract)
+        brief = render_handoff_brief("pricing", contract, {"pricing": contract}, stub=stub)
+        context = build_code_agent_context(contract, suite, stub=stub)
+        assert len(calls) == 1
+        assert f"```python\n{stub}\n```" in brief
+        assert f"```python\n{stub}\n```" in context
+
+    def test_renders_when_not_passed(self, monkeypatch):
+        import pact.interface_stub as stub_mod
+
+        calls = []
+
+        def counting_render(contract):
+            calls.append(contract)
+            return render_stub(contract)
+
+        monkeypatch.setattr(stub_mod, "_DEFAULT_STUB_RENDERER", (counting_render, "python"))
+        contract = _make_pricing_contract()
+        suite = ContractTestSuite(component_id="pricing", contract_version=1)
+        render_handoff_brief("pricing", contract, {"pricing": contract})
+        build_code_agent_context(contract, suite)
+        assert len(calls) == 2
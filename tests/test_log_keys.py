@@ -43,6 +43,11 @@ class TestRenderLogKeyPreamble:
         assert "PactFormatter" in preamble
         assert "pact_key" in preamble
 
+    def test_repeat_call_returns_cached_string(self):
+        first = render_log_key_preamble("abc123", "cached_comp")
+        assert render_log_key_preamble("abc123", "cached_comp") is first
+        assert render_log_key_preamble("abc123", "other_comp") is not first
+
 
 class TestLogKeyFormat:
     def test_matches_expected_pattern(self):
@@ -81,6 +86,12 @@ class TestProjectIdHash:
         h = project_id_hash("/tmp/test")
         assert all(c in "0123456789abcdef" for c in h)
 
+    def test_repeat_call_is_cached(self):
+        project_id_hash.cache_clear()
+        project_id_hash("/tmp/cached")
+        project_id_hash("/tmp/cached")
+        assert project_id_hash.cache_info().hits == 1
+
 
 class TestHandoffBriefWithLogKey:
     def _make_contract(self) -> ComponentContract:
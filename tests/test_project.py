@@ -139,6 +139,36 @@ class TestAudit:
         entries = tmp_project.load_audit()
         assert entries == []
 
+    def test_audit_batch_flushes_on_exit(self, tmp_project: ProjectManager):
+        with tmp_project.audit_batch() as audit:
+            audit.append("action1", "d1")
+            audit.append("action2", "d2", component_id="x")
+            assert tmp_project.load_audit() == []
+        entries = tmp_project.load_audit()
+        assert [e["action"] for e in entries] == ["action1", "action2"]
+        assert entries[1]["component_id"] == "x"
+        assert all(e["timestamp"] for e in entries)
+
+    def test_audit_batch_flushes_on_error(self, tmp_project: ProjectManager):
+        with pytest.raises(RuntimeError):
+            with tmp_project.audit_batch() as audit:
+                audit.append("before_error")
+                raise RuntimeError("boom")
+        assert [e["action"] for e in tmp_project.load_audit()] == ["before_error"]
+
+    def test_audit_batch_flush_writes_pending(self, tmp_project: ProjectManager):
+        with tmp_project.audit_batch() as audit:
+            audit.append("step1")
+            audit.flush()
+            assert [e["action"] for e in tmp_project.load_audit()] == ["step1"]
+            audit.append("step2")
+        assert [e["action"] for e in tmp_project.load_audit()] == ["step1", "step2"]
+
+    def test_empty_audit_batch_writes_nothing(self, tmp_project: ProjectManager):
+        with tmp_project.audit_batch():
+            pass
+        assert not tmp_project.audit_path.exists()
+
 
 class TestDecomposition:
     def test_save_and_load_tree(self, tmp_project: ProjectManager):
@@ -347,6 +377,10 @@ class TestImplementations:
         assert d.name == "pricing"
         assert d.parent.name == "src"
 
+    def test_integration_cache_dir(self, tmp_project: ProjectManager):
+        d = tmp_project.integration_cache_dir
+        assert d == tmp_project.project_dir / ".pact" / "integration"
+
     def test_save_metadata(self, tmp_project: ProjectManager):
         tmp_project.save_impl_metadata("pricing", {"attempt": 1})
         path = tmp_project.impl_dir("pricing") / "metadata.json"
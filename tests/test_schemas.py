@@ -269,6 +269,10 @@ class TestDecompositionModels:
         assert order[-1] == "root"
         assert set(order) == {"root", "a", "b"}
 
+        items = tree.topological_items()
+        assert [node_id for node_id, _ in items] == order
+        assert all(node is tree.nodes[node_id] for node_id, node in items)
+
     def test_tree_children_of(self):
         tree = DecompositionTree(
             root_id="root",
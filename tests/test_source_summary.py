@@ -0,0 +1,118 @@
+"""Tests for source summaries used in integration prompts."""
+
+from pact.source_summary import summarize_python, summarize_source, summarize_ts
+
+
+PY_SOURCE = '''
+import os
+
+MAX_ITEMS = 10
+_CACHE = {}
+
+
+def public(a: int, b: str = "x") -> list[str]:
+    """Do the public thing.
+
+    More detail that should not survive.
+    """
+    result = []
+    for i in range(a):
+        result.append(b * i)
+    return result
+
+
+def _helper():
+    return 1
+
+
+async def fetch(url: str) -> bytes:
+    return b""
+
+
+class Widget(Base):
+    """A widget."""
+    name: str
+    size: int = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def render(self) -> str:
+        return self.name * 2
+
+    def _private(self):
+        pass
+'''
+
+
+class TestSummarizePython:
+    def test_keeps_signatures(self):
+        out = summarize_python(PY_SOURCE)
+        assert "def public(a: int, b: str='x') -> list[str]:" in out
+        assert "async def fetch(url: str) -> bytes:" in out
+        assert "class Widget(Base):" in out
+        assert "def render(self) -> str:" in out
+        assert "def __init__(self, name):" in out
+
+    def test_keeps_docstring_first_line_only(self):
+        out = summarize_python(PY_SOURCE)
+        assert "Do the public thing." in out
+        assert "More detail" not in out
+
+    def test_drops_bodies(self):
+        out = summarize_python(PY_SOURCE)
+        assert "result.append" not in out
+        assert "self.name * 2" not in out
+
+    def test_drops_private(self):
+        out = summarize_python(PY_SOURCE)
+        assert "_helper" not in out
+        assert "_private" not in out
+
+    def test_keeps_fields_and_constants(self):
+        out = summarize_python(PY_SOURCE)
+        assert "name: str" in out
+        assert "size: int = 0" in out
+        assert "MAX_ITEMS = 10" in out
+
+    def test_drops_imports(self):
+        assert "import os" not in summarize_python(PY_SOURCE)
+
+    def test_long_assignments_dropped(self):
+        src = "TABLE = [" + ", ".join(str(i) for i in range(200)) + "]\n"
+        assert summarize_python(src) == ""
+
+    def test_syntax_error_falls_back_to_regex(self):
+        src = "def ok(a):\n    return (\nclass Broken:\n"
+        out = summarize_python(src)
+        assert "def ok(a):" in out
+        assert "class Broken:" in out
+
+
+class TestSummarizeTs:
+    def test_keeps_exports(self):
+        src = (
+            "import { x } from './x';\n"
+            "export function add(a: number, b: number): number {\n"
+            "  return a + b;\n"
+            "}\n"
+            "export interface Point {\n  x: number;\n}\n"
+            "export const LIMIT = 5;\n"
+            "function hidden() {}\n"
+        )
+        out = summarize_ts(src)
+        assert "export function add(a: number, b: number): number" in out
+        assert "export interface Point" in out
+        assert "export const LIMIT = 5;" in out
+        assert "hidden" not in out
+        assert "return a + b" not in out
+        assert "{" not in out
+
+
+class TestSummarizeSource:
+    def test_dispatch(self):
+        assert "def f" in summarize_source("a.py", "def f():\n    return 1\n")
+        assert "export function g" in summarize_source("a.js", "export function g() {}\n")
+
+    def test_unknown_passthrough(self):
+        assert summarize_source("a.txt", "hello") == "hello"